@@ -2,11 +2,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List, Tuple, Dict
+import threading
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from app.database.session import get_db
+from sqlalchemy import case, column, inspect, or_, select, table, update
+from app.db.session import get_async_db
+from app.core.password_pool import PoolSaturated
 from app.core.security import (
-    verify_password,
+    verify_and_update_async,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -22,14 +25,30 @@ class LoginJSON(BaseModel):
 
 
 # ---------- helpers ----------
+# Colunas de login por tipo de chave: com "@" procura primeiro por email
+_EMAIL_KEYS = ["email"]
+_NAME_KEYS = ["username", "login", "usuario"]
+
+# Colunas de 'users', descobertas uma vez (startup ou 1º login) e reaproveitadas
+_users_cols: Optional[List[str]] = None
+_users_cols_lock = threading.Lock()
+
+
+def load_users_columns(bind) -> List[str]:
+    """Lê as colunas de 'users' via inspect (funciona em SQLite e Postgres) e guarda em cache."""
+    global _users_cols
+    with _users_cols_lock:
+        _users_cols = [c["name"] for c in inspect(bind).get_columns("users")]
+        return _users_cols
+
+
 def _users_columns(db: Session) -> List[str]:
-    cols = []
+    if _users_cols is not None:
+        return _users_cols
     try:
-        res = db.execute(text("PRAGMA table_info(users);"))
-        cols = [row[1] for row in res]  # (cid, name, type, notnull, dflt_value, pk)
+        return load_users_columns(db.connection())
     except Exception:
-        pass
-    return cols
+        return []  # tabela ausente: não cacheia, tenta de novo no próximo login
 
 
 def _pick_existing(candidates: List[str], cols: List[str]) -> List[str]:
@@ -41,23 +60,67 @@ def _find_user_row(db: Session, key: str) -> Tuple[Optional[Dict], List[str]]:
     if not cols:
         raise HTTPException(status_code=500, detail="Tabela 'users' não encontrada")
 
-    user_keys = _pick_existing(["username", "email", "login", "usuario"], cols)
-    if not user_keys:
+    email_keys = _pick_existing(_EMAIL_KEYS, cols)
+    name_keys = _pick_existing(_NAME_KEYS, cols)
+    if not email_keys and not name_keys:
         raise HTTPException(status_code=500, detail="Nenhuma coluna de login reconhecida em 'users'")
 
-    where = " OR ".join([f"{c} = :key" for c in user_keys])
-    sql = text(f"SELECT * FROM users WHERE {where} LIMIT 1;")
-    row = db.execute(sql, {"key": key}).mappings().first()
-    return (dict(row) if row else None, cols)
+    # Uma query só (OR entre as colunas de login; cada igualdade usa o índice da coluna);
+    # o ORDER BY CASE mantém a preferência: com "@", email primeiro, senão os nomes.
+    users = table("users", *[column(c) for c in cols])
+    ordem = email_keys + name_keys if "@" in key else name_keys + email_keys
+    match = [users.c[c] == key for c in ordem]
+    stmt = select(users).where(or_(*match)).limit(1)
+    if len(match) > 1:
+        stmt = stmt.order_by(case(*((m, i) for i, m in enumerate(match)), else_=len(match)))
+    row = db.execute(stmt).mappings().first()
+    return (dict(row) if row else None), cols
 
 
-def _extract_hash(user_row: Dict, cols: List[str]) -> Optional[str]:
+def _hash_column(user_row: Dict, cols: List[str]) -> Optional[str]:
     for c in ["hashed_password", "password_hash", "senha_hash", "password", "senha"]:
         if c in cols and user_row.get(c):
-            return user_row[c]
+            return c
     return None
 
 
+def _extract_hash(user_row: Dict, cols: List[str]) -> Optional[str]:
+    c = _hash_column(user_row, cols)
+    return user_row[c] if c else None
+
+
+def _save_rehash(db: Session, user_row: Dict, cols: List[str], new_hash: str) -> None:
+    col = _hash_column(user_row, cols)
+    if not col or "id" not in cols:
+        return
+    users = table("users", *[column(c) for c in cols])
+    db.execute(update(users).where(users.c.id == user_row["id"]).values({col: new_hash}))
+    db.commit()
+
+
+async def _check_password(db: AsyncSession, user_row: Dict, cols: List[str], plain: str) -> bool:
+    pwd_hash = _extract_hash(user_row, cols)
+    if not pwd_hash:
+        return False
+    try:
+        ok, new_hash = await verify_and_update_async(plain, pwd_hash)
+    except PoolSaturated:
+        # backpressure: muitos logins ao mesmo tempo, o cliente tenta de novo
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Muitas tentativas de login, tente novamente",
+            headers={"Retry-After": "1"},
+        )
+    if ok and new_hash:
+        # hash em esquema/custo antigo: regrava com o configurado (falha aqui não bloqueia o login)
+        try:
+            await db.run_sync(_save_rehash, user_row, cols, new_hash)
+        except Exception as e:
+            await db.rollback()
+            print("[AUTH] rehash não salvo:", e)
+    return ok
+
+
 def _user_id_and_label(user_row: Dict, cols: List[str]) -> Tuple[str, Optional[str]]:
     uid = str(user_row.get("id") or user_row.get("user_id") or "0")
     label = None
@@ -70,7 +133,7 @@ def _user_id_and_label(user_row: Dict, cols: List[str]) -> Tuple[str, Optional[s
 
 # ---------- rotas ----------
 @router.post("/login")
-async def login(request: Request, db: Session = Depends(get_db)):
+async def login(request: Request, db: AsyncSession = Depends(get_async_db)):
     ctype = (request.headers.get("content-type") or "").lower()
 
     # JSON
@@ -85,12 +148,11 @@ async def login(request: Request, db: Session = Depends(get_db)):
         if not key:
             raise HTTPException(status_code=422, detail="Informe username/login ou email")
 
-        user_row, cols = _find_user_row(db, str(key))
+        user_row, cols = await db.run_sync(_find_user_row, str(key))
         if not user_row:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
 
-        pwd_hash = _extract_hash(user_row, cols)
-        if not pwd_hash or not verify_password(payload.password, pwd_hash):
+        if not await _check_password(db, user_row, cols, payload.password):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciais inválidas")
 
         uid, label = _user_id_and_label(user_row, cols)
@@ -108,11 +170,10 @@ async def login(request: Request, db: Session = Depends(get_db)):
     if not key or not password:
         raise HTTPException(status_code=422, detail="Payload inválido")
 
-    user_row, cols = _find_user_row(db, key)
+    user_row, cols = await db.run_sync(_find_user_row, key)
     if not user_row:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
-    pwd_hash = _extract_hash(user_row, cols)
-    if not pwd_hash or not verify_password(password, pwd_hash):
+    if not await _check_password(db, user_row, cols, password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciais inválidas")
     uid, label = _user_id_and_label(user_row, cols)
     tok = create_access_token(sub=uid, extra={"user": label})
@@ -0,0 +1,128 @@
+# app/api/v1/routes/exports.py
+"""
+Export do ledger em background:
+  POST /exports                 -> cria (202) ou reaproveita (200) o job
+  GET  /exports/{id}            -> status (download_url quando DONE)
+  GET  /exports/{id}/download   -> arquivo, com Range (retomar download)
+"""
+from __future__ import annotations
+
+import os
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.models.export_job import ExportJob
+from app.services.export_jobs import EXTENSIONS, MEDIA_TYPES, export_jobs
+
+router = APIRouter()
+
+RANGE_CHUNK = 64 * 1024
+
+
+class ExportJobIn(BaseModel):
+    wallet_id: int
+    formato: Literal["csv", "parquet", "arrow"] = "csv"
+    tipo: Literal["CREDITO", "DEBITO"] | None = None
+    start: str | None = None
+    end: str | None = None
+    order_by: str = "data"
+    order_dir: Literal["asc", "desc"] = "desc"
+    csv_sep: str = ";"
+    csv_decimal: str = "comma"
+
+
+@router.post("/exports", status_code=202)
+def create_export(body: ExportJobIn, response: Response, db: Session = Depends(get_db)):
+    params = body.model_dump(exclude={"wallet_id", "formato"})
+    if body.formato != "csv":
+        params.pop("csv_sep"), params.pop("csv_decimal")  # não mudam o arquivo: não entram na chave
+    job, reused = export_jobs.create(db, body.wallet_id, body.formato, params)
+    if reused:
+        response.status_code = 200
+    response.headers["Location"] = f"/api/v1/exports/{job.id}"
+    return export_jobs.describe(job)
+
+
+def _get_job(db: Session, job_id: str) -> ExportJob:
+    job = db.get(ExportJob, job_id)
+    if job is None:
+        raise HTTPException(404, "Export não encontrado")
+    return job
+
+
+@router.get("/exports/{job_id}")
+def get_export(job_id: str, db: Session = Depends(get_db)):
+    return export_jobs.describe(_get_job(db, job_id))
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """`bytes=a-b`, `bytes=a-` ou `bytes=-n` -> (início, fim) inclusivo. Vários ranges: ignora (200)."""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first == "":
+            n = int(last)
+            if n <= 0:
+                raise ValueError
+            start, end = max(0, size - n), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        raise HTTPException(416, "Range fora do arquivo", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def _iter_file(path: str, start: int, end: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        left = end - start + 1
+        while left > 0:
+            chunk = f.read(min(RANGE_CHUNK, left))
+            if not chunk:
+                break
+            left -= len(chunk)
+            yield chunk
+
+
+@router.get("/exports/{job_id}/download")
+def download_export(
+    job_id: str,
+    range_: str | None = Header(default=None, alias="Range"),
+    if_range: str | None = Header(default=None, alias="If-Range"),
+    db: Session = Depends(get_db),
+):
+    job = _get_job(db, job_id)
+    if job.status != "DONE":
+        raise HTTPException(409, f"Export ainda não está pronto ({job.status})")
+    if not job.arquivo or not os.path.exists(job.arquivo):
+        raise HTTPException(410, "Arquivo do export expirou")
+
+    size = os.path.getsize(job.arquivo)
+    etag = f'"{job.id}-{size}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Disposition": f'attachment; filename="ledger_{job.wallet_id}_{job.id}.{EXTENSIONS[job.formato]}"',
+    }
+    # If-Range diferente do ETag: o arquivo mudou, manda inteiro
+    rng = _parse_range(range_, size) if range_ and size and (not if_range or if_range == etag) else None
+    if rng is None:
+        return FileResponse(job.arquivo, media_type=MEDIA_TYPES[job.formato], headers=headers)
+
+    start, end = rng
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file(job.arquivo, start, end), status_code=206, media_type=MEDIA_TYPES[job.formato], headers=headers
+    )
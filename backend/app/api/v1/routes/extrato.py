@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Query, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func, select
 from datetime import datetime
 from fastapi.responses import StreamingResponse
 import csv, io
 
-from app.database.session import get_db
+from app.core.responses import FastJSONResponse
+from app.db.session import get_async_db, get_db
 
 # Tenta achar o modelo de lançamentos
 Model = None
@@ -46,6 +48,18 @@ def _field_name(*candidates):
             return name
     return None
 
+def _totais_stmt(conds, typ_col, val_col):
+    """SELECT (total, credito, debito) do conjunto filtrado numa única query agregada."""
+    return select(
+        func.count(),
+        func.coalesce(func.sum(case((func.upper(typ_col) == "CREDITO", val_col), else_=0)), 0),
+        func.coalesce(func.sum(case((func.upper(typ_col) == "DEBITO", val_col), else_=0)), 0),
+    ).select_from(Model).where(*conds)
+
+def _totais_row(row):
+    total, credito, debito = row
+    return int(total or 0), float(credito or 0), float(debito or 0)
+
 @router.get("/extrato/_diag", tags=["Extrato"])
 def diag(db: Session = Depends(get_db)):
     if Model is None:
@@ -65,7 +79,7 @@ def diag(db: Session = Depends(get_db)):
     }
 
 @router.get("/extrato", tags=["Extrato"])
-def listar_extrato(
+async def listar_extrato(
     data_inicial: str | None = Query(None, description="YYYY-MM-DD"),
     data_final: str | None = Query(None, description="YYYY-MM-DD"),
     tipo: str | None = Query(None, description="CREDITO ou DEBITO"),
@@ -73,7 +87,7 @@ def listar_extrato(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=500),
     response: Response = None,
-    db = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
 
     # Parse datas e pega coluna de data do modelo
@@ -100,26 +114,16 @@ def listar_extrato(
         conds.append(typ_col == tnorm)
 
     # Query base filtrada
-    q = db.query(Model).filter(*conds).order_by(data_field.desc())
+    q = select(Model).where(*conds).order_by(data_field.desc())
 
-    # Total de itens
-    total = q.count()
+    # Total de itens + totais do período (um round trip, sem carregar linhas)
+    total, credito, debito = _totais_row(
+        (await db.execute(_totais_stmt(conds, typ_col, val_col))).one()
+    )
 
     # Paginação
-    rows = q.offset((page - 1) * page_size).limit(page_size).all()
-
-    # Totais do período (varrem o conjunto filtrado completo)
-    # Para não estourar memória, se o volume crescer muito, troca por agregação SQL depois.
-    all_rows = db.query(Model).filter(*conds).all()
-    credito = 0.0
-    debito  = 0.0
-    for t in all_rows:
-        v = float(getattr(t, fname_valor, 0) or 0)
-        k = str(getattr(t, fname_tipo, "") or "").upper()
-        if k == "CREDITO":
-            credito += v
-        elif k == "DEBITO":
-            debito += v
+    rows = (await db.execute(q.offset((page - 1) * page_size).limit(page_size))).scalars().all()
+
     saldo_periodo = credito - debito
 
     # Headers de totais/paginação (se houver Response)
@@ -162,5 +166,5 @@ def listar_extrato(
             "valor": float(getattr(t, fname_valor, 0) or 0),
             "descricao": getattr(t, fname_desc, None),
         })
-    return resp
+    return FastJSONResponse(resp, headers=dict(response.headers) if response is not None else None)
 
@@ -1,7 +1,34 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.password_pool import password_pool
+from app.core.result_cache import result_cache
+from app.core.security import claims_cache
+from app.db.session import get_async_db, pool_metrics
+from app.services.psp_service import inbox_metrics, inbox_workers
 
 router = APIRouter()
 
 @router.get("/health")
 def health():
     return {"status": "ok"}
+
+@router.get("/health/db")
+def health_db():
+    # checkouts/espera/timeouts dos pools: timeouts ou wait_max alto = pool esgotado
+    return {"status": "ok", "pools": pool_metrics()}
+
+@router.get("/health/inbox")
+async def health_inbox(db: AsyncSession = Depends(get_async_db)):
+    # profundidade/lag da fila do webhook (WEBHOOK_ASYNC_MODE) + contadores dos workers
+    return {"status": "ok", "queue": await inbox_metrics(db), "workers": inbox_workers.stats()}
+
+@router.get("/health/auth")
+def health_auth():
+    # pool do bcrypt (rejected/wait alto = login storm) + cache de claims JWT
+    return {"status": "ok", "password_pool": password_pool.stats(), "claims_cache": claims_cache.stats()}
+
+@router.get("/health/cache")
+def health_cache():
+    # cache de resultado do ledger: hit_ratio, invalidações por escrita, erros do backend
+    return {"status": "ok", "result_cache": result_cache.stats()}
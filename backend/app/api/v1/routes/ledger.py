@@ -1,17 +1,30 @@
 # app/api/v1/routes/ledger.py
 from __future__ import annotations
 
+import base64
 import csv
 import io
+import json
 from datetime import datetime
+from decimal import Decimal
 from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from fastapi.responses import Response as FastAPIResponse
-from sqlalchemy import asc, case, desc, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import String, and_, asc, desc, literal, or_, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database.session import get_db
+from app.core.config import settings
+from app.core.http_cache import make_etag, not_modified, query_fingerprint, validators
+from app.core.responses import FastJSONResponse
+from app.core.result_cache import result_cache
+from app.db.session import SessionLocal, get_async_db
+from app.schemas.ledger import PostLedgerEntry
+from app.services import ledger_export
+from app.services.ledger_service import (
+    LedgerPostError, balance_as_of, ledger_version, post_ledger_entries, range_totals,
+)
 
 try:
     from app.models.transaction import Transaction as TM  # modelo "principal"
@@ -45,13 +58,23 @@ ORDER_MAP = {
     "descricao": DESC_COL,
 }
 
+# Colunas do corpo (JSON/CSV), resolvidas uma vez no import: as páginas selecionam
+# só isso, como tuplas, sem carregar o modelo ORM (sem identity map / instrumentação).
+ROW_COLS = (
+    TM.id.label("id"),
+    DATE_COL.label("data"),
+    TIPO_COL.label("tipo"),
+    VALOR_COL.label("valor"),
+    DESC_COL.label("descricao"),
+)
+
 
 def _parse_dt(x: str | None, end_of_day: bool = False):
     if not x:
         return None
     x = x.strip()
     if len(x) == 10:
-        x = x + (" 23:59:59" if end_of_day else " 00:00:00")
+        x = x + (" 23:59:59.999999" if end_of_day else " 00:00:00")
     try:
         return datetime.fromisoformat(x.replace("Z", "+00:00"))
     except Exception:
@@ -59,16 +82,114 @@ def _parse_dt(x: str | None, end_of_day: bool = False):
         return x
 
 
-def _get_attr(obj, col):
-    if hasattr(col, "key"):
-        try:
-            return getattr(obj, col.key)
-        except Exception:
-            pass
-    for name in ("criado_em", "data", "created_at"):
-        if hasattr(obj, name):
-            return getattr(obj, name)
-    return None
+# ---- Cursor (keyset) ----
+# O cursor é opaco pro cliente: base64 de [valor_da_coluna, id, voltar?, order_by, order_dir].
+# A chave volta pro tipo da coluna (datetime/Decimal) e é comparada com o tipo dela, o que
+# o Postgres exige. No SQLite (`raw_text`), DateTime é texto e o formato varia (com/sem
+# microssegundos): lá a chave vai "crua", como está gravada, pra comparação bater com o lido.
+def _encode_cursor(key, id_, backward: bool, order_by: str, order_dir: str) -> str:
+    if isinstance(key, datetime):
+        key = key.isoformat(sep=" ")
+    elif isinstance(key, Decimal):
+        key = str(key)
+    raw = json.dumps([key, id_, backward, order_by, order_dir], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _typed_key(key, col):
+    """Chave do cursor (JSON) -> tipo Python da coluna de ordenação."""
+    if key is None:
+        return None
+    py = col.type.python_type
+    if py is datetime:
+        return datetime.fromisoformat(str(key).replace("Z", "+00:00"))
+    if py is Decimal:
+        return Decimal(str(key))
+    if py is int:
+        return int(key)
+    return str(key)
+
+
+def _decode_cursor(cursor: str, order_by: str, order_dir: str, col=None):
+    """(chave, id, voltar?). Com `col`, a chave volta tipada pra coluna."""
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        key, id_, backward, c_order_by, c_order_dir = json.loads(
+            base64.urlsafe_b64decode(cursor + pad)
+        )
+        id_ = int(id_)
+        if col is not None:
+            key = _typed_key(key, col)
+    except Exception:
+        raise HTTPException(400, "cursor inválido")
+    if (c_order_by, c_order_dir) != (order_by, order_dir):
+        raise HTTPException(400, "cursor não corresponde a order_by/order_dir")
+    return key, id_, bool(backward)
+
+
+def _ledger_filter_stmt(wallet_id: int, tipo=None, ds=None, de=None):
+    """SELECT só das colunas do corpo (sem ORM), com os filtros do ledger."""
+    stmt = select(*ROW_COLS).where(wallet_id == WALLET_COL)
+    if tipo in ("CREDITO", "DEBITO"):
+        stmt = stmt.where(tipo == TIPO_COL)
+    if ds is not None:
+        stmt = stmt.where(ds <= DATE_COL)
+    if de is not None:
+        stmt = stmt.where(de >= DATE_COL)
+    return stmt
+
+
+def _ledger_rows_stmt(wallet_id: int, tipo=None, ds=None, de=None, col=None, order_dir="desc"):
+    """`_ledger_filter_stmt` + ordenação (CSV/export e index advisor)."""
+    stmt = _ledger_filter_stmt(wallet_id, tipo, ds, de)
+    col = DATE_COL if col is None else col
+    return stmt.order_by(desc(col) if order_dir.lower() == "desc" else asc(col))
+
+
+def _keyset_stmt(
+    stmt, col, order_by: str, order_dir: str, cursor: str, page_size: int, raw_text: bool = False
+):
+    """
+    Página por keyset em (col, id): custo constante, independente da "profundidade".
+    `cursor` vazio = primeira página. `raw_text` = SQLite (compara o texto gravado).
+    Retorna (select, backward).
+    """
+    key_col = type_coerce(col, String) if raw_text else col
+    id_col = TM.id
+    backward = False
+
+    if cursor:
+        key, last_id, backward = _decode_cursor(cursor, order_by, order_dir, None if raw_text else col)
+        k = literal(key, String) if raw_text else literal(key, col.type)
+        # andar "pra frente" na ordem pedida, ou "pra trás" quando o cursor é prev
+        go_lower = (order_dir == "desc") != backward
+        if go_lower:
+            stmt = stmt.where(or_(key_col < k, and_(key_col == k, id_col < last_id)))
+        else:
+            stmt = stmt.where(or_(key_col > k, and_(key_col == k, id_col > last_id)))
+
+    scan_desc = (order_dir == "desc") != backward
+    ob = (desc(col), desc(id_col)) if scan_desc else (asc(col), asc(id_col))
+    stmt = stmt.add_columns(key_col.label("_k")).order_by(*ob).limit(page_size + 1)
+    return stmt, backward
+
+
+def _keyset_result(rows, backward: bool, cursor: str, order_by: str, order_dir: str, page_size: int):
+    """Corta o lookahead e monta os cursores. Retorna (items, next_cursor, prev_cursor)."""
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backward:
+        rows.reverse()
+
+    items = [r[:-1] for r in rows]
+    next_cursor = prev_cursor = None
+    if rows:
+        first, last = rows[0], rows[-1]
+        if backward or has_more:
+            next_cursor = _encode_cursor(last._k, last.id, False, order_by, order_dir)
+        if (backward and has_more) or (not backward and cursor):
+            prev_cursor = _encode_cursor(first._k, first.id, True, order_by, order_dir)
+    return items, next_cursor, prev_cursor
 
 
 def _fmt_dt(v):
@@ -82,10 +203,56 @@ def _fmt_dt(v):
         return str(v)
 
 
+def _rows_to_json(rows) -> list[dict]:
+    """Serializa tuplas (id, data, tipo, valor, descricao) numa passada só."""
+    fmt = _fmt_dt
+    return [
+        {
+            "id": id_,
+            "data": fmt(dt),
+            "tipo": tipo,
+            "valor": float(valor or 0.0),
+            "descricao": "" if desc_txt is None else desc_txt,
+        }
+        for id_, dt, tipo, valor, desc_txt in rows
+    ]
+
+
+# ========= Lançamento em lote =========
+@router.post("/ledger/{wallet_id}/entries", status_code=201)
+async def post_ledger_bulk(
+    wallet_id: int,
+    entries: list[PostLedgerEntry],
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Lote de lançamentos (jobs de back-office): tudo ou nada, validado antes de gravar."""
+    if len(entries) > settings.LEDGER_BULK_MAX:
+        raise HTTPException(413, f"lote acima de {settings.LEDGER_BULK_MAX} lançamentos")
+    try:
+        return await db.run_sync(post_ledger_entries, wallet_id, entries)
+    except LedgerPostError as e:
+        raise HTTPException(e.status_code, e.detail)
+
+
+# ========= Saldo em T =========
+@router.get("/ledger/{wallet_id}/saldo")
+async def get_saldo_em(
+    wallet_id: int,
+    em: str | None = Query(default=None, description="Data/hora (ISO); só a data = fim do dia; vazio = agora"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    t = _parse_dt(em, True)
+    if isinstance(t, str):
+        raise HTTPException(400, "data inválida")
+    saldo = await db.run_sync(balance_as_of, wallet_id, t)
+    return {"wallet_id": wallet_id, "em": t.isoformat() if t else None, "saldo": round(saldo, 2)}
+
+
 # ========= JSON (paginado) =========
 @router.get("/ledger/{ledger_id}")
-def get_ledger(
+async def get_ledger(
     ledger_id: int,
+    request: Request,
     response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=200),
@@ -94,86 +261,143 @@ def get_ledger(
     end: str | None = None,
     order_by: str = Query("data"),
     order_dir: Literal["asc", "desc"] = Query("desc"),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(
+        default=None,
+        description="Modo keyset: vazio = primeira página; depois use X-Next-Cursor/X-Prev-Cursor",
+    ),
+    db: AsyncSession = Depends(get_async_db),
 ):
     if WALLET_COL is None:
         raise HTTPException(500, "Modelo de transação não tem coluna wallet/ledger id")
 
-    # base query
-    q = db.query(TM).filter(ledger_id == WALLET_COL)
-
-    # filtro por tipo (se veio)
-    if tipo:
-        q = q.filter(tipo == TIPO_COL)
+    # ETag pela versão da carteira: ledger sem escrita nova = 304 sem rodar página/totais
+    versao, ultima_escrita = await db.run_sync(ledger_version, ledger_id)
+    fingerprint = query_fingerprint(request)
+    etag = make_etag("ledger", ledger_id, versao, fingerprint)
+    cached = not_modified(request, etag, ultima_escrita)
+    if cached is not None:
+        return cached
+    response.headers.update(validators(etag, ultima_escrita))
+
+    # mesma carteira/versão/consulta já calculada: devolve sem contar, somar nem paginar
+    hit = await result_cache.aget(ledger_id, versao, fingerprint)
+    if hit is not None:
+        body, headers = hit
+        return Response(body, media_type="application/json", headers={**headers, **response.headers})
 
     # datas (precisa calcular antes de usar nos filtros)
     ds, de = _parse_dt(start, False), _parse_dt(end, True)
-    if ds is not None:
-        q = q.filter(ds <= DATE_COL)
-    if de is not None:
-        q = q.filter(de >= DATE_COL)
-
-    # totais globais
-    subq = q.with_entities(
-        TM.id.label("id"),
-        DATE_COL.label("data"),
-        TIPO_COL.label("tipo"),
-        VALOR_COL.label("valor"),
-        DESC_COL.label("descricao"),
-    ).subquery()
-
-    total_count = db.query(func.count()).select_from(subq).scalar() or 0
-    tot_credito, tot_debito = db.query(
-        func.coalesce(
-            func.sum(case((subq.c.tipo == "CREDITO", subq.c.valor), else_=0.0)), 0.0
-        ),
-        func.coalesce(
-            func.sum(case((subq.c.tipo == "DEBITO", subq.c.valor), else_=0.0)), 0.0
-        ),
-    ).one()
 
-    tot_credito = float(tot_credito or 0.0)
-    tot_debito = float(tot_debito or 0.0)
+    # base: wallet + tipo + período
+    stmt = _ledger_filter_stmt(ledger_id, tipo, ds, de)
+
+    # totais globais (buckets diários + bordas parciais; não cresce com o ledger)
+    total_count, tot_credito, tot_debito = await db.run_sync(
+        range_totals, ledger_id, ds, de, tipo
+    )
     saldo = tot_credito - tot_debito
 
+    # saldo final (checkpoint + cauda) e inicial = final - movimento do período (todos os tipos)
+    saldo_final = await db.run_sync(balance_as_of, ledger_id, de)
+    if tipo is None:
+        mov = saldo
+    else:
+        _, cr_all, db_all = await db.run_sync(range_totals, ledger_id, ds, de)
+        mov = cr_all - db_all
+    saldo_inicial = saldo_final - mov
+
     # ordenação + paginação
     col = ORDER_MAP.get(order_by, DATE_COL)
-    q_sorted = q.order_by(asc(col) if order_dir == "asc" else desc(col))
-    items = q_sorted.offset((page - 1) * page_size).limit(page_size).all()
+    if cursor is not None:
+        raw_text = db.bind.dialect.name == "sqlite"
+        stmt, backward = _keyset_stmt(stmt, col, order_by, order_dir, cursor, page_size, raw_text)
+        rows = (await db.execute(stmt)).all()
+        items, next_cursor, prev_cursor = _keyset_result(
+            rows, backward, cursor, order_by, order_dir, page_size
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        if prev_cursor:
+            response.headers["X-Prev-Cursor"] = prev_cursor
+    else:
+        stmt = (
+            stmt.order_by(asc(col) if order_dir == "asc" else desc(col))
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        items = (await db.execute(stmt)).all()
+        response.headers["X-Page"] = str(page)
 
     # headers
     total_pages = max(1, (total_count + page_size - 1) // page_size)
     response.headers["X-Total"] = str(total_count)
     response.headers["X-Total-Count"] = str(total_count)
     response.headers["X-Total-Pages"] = str(total_pages)
-    response.headers["X-Page"] = str(page)
     response.headers["X-Page-Size"] = str(page_size)
     response.headers["X-Total-Credito"] = f"{tot_credito:.2f}"
     response.headers["X-Total-Debito"] = f"{tot_debito:.2f}"
     response.headers["X-Total-Saldo"] = f"{saldo:.2f}"
-
-    # corpo
-    out = []
-    for it in items:
-        dt = _get_attr(it, DATE_COL)
-        desc_txt = getattr(it, getattr(DESC_COL, "key", "referencia"), None)
-        if desc_txt is None:
-            desc_txt = getattr(it, "descricao", "") or ""
-        out.append(
-            {
-                "id": getattr(it, "id", None),
-                "data": _fmt_dt(dt),
-                "tipo": getattr(it, getattr(TIPO_COL, "key", "tipo"), ""),
-                "valor": float(
-                    getattr(it, getattr(VALOR_COL, "key", "valor"), 0.0) or 0.0
-                ),
-                "descricao": desc_txt,
-            }
-        )
+    response.headers["X-Saldo-Inicial"] = f"{saldo_inicial:.2f}"
+    response.headers["X-Saldo-Final"] = f"{saldo_final:.2f}"
+
+    # corpo (resposta direta: pula o jsonable_encoder; headers vão junto)
+    out = FastJSONResponse(_rows_to_json(items), headers=dict(response.headers))
+    await result_cache.aput(
+        ledger_id, versao, fingerprint, out.body,
+        {k: v for k, v in response.headers.items() if k.lower().startswith("x-")},
+    )
     return out
 
 
-# ========= CSV (não streaming) =========
+# ========= CSV (streaming) =========
+CSV_BATCH_SIZE = 1000  # linhas por lote lido do cursor / chunk enviado
+
+
+def _iter_csv(stmt, header: list[str], fmt_row, delimiter: str = ","):
+    """
+    Gera o CSV em chunks de bytes, lendo em lotes com cursor server-side (yield_per).
+    Abre a própria sessão: a do Depends(get_db) fecha antes do corpo ser enviado.
+    """
+    buf = io.StringIO()
+    w = csv.writer(buf, delimiter=delimiter, quoting=csv.QUOTE_MINIMAL)
+    w.writerow(header)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=CSV_BATCH_SIZE))
+        for batch in result.partitions():
+            w.writerows(fmt_row(r) for r in batch)
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+        tail = buf.getvalue()  # só o cabeçalho, se não veio nenhuma linha
+        if tail:
+            yield tail.encode("utf-8")
+    finally:
+        db.close()
+
+
+CSV_HEADER = ["id", "data", "tipo", "valor", "descricao"]
+
+
+def _csv_row_formatter(use_comma: bool):
+    """Linha do CSV do ledger; `use_comma` = decimal com vírgula (BR)."""
+
+    def fmt_row(r):
+        val = f"{float(r.valor or 0):.2f}"
+        if use_comma:
+            val = val.replace(".", ",")
+        return [
+            r.id if r.id is not None else "",
+            _fmt_dt(r.data),
+            r.tipo or "",
+            val,
+            (r.descricao or "").replace("\n", " "),
+        ]
+
+    return fmt_row
+
+
 @router.get("/ledger/{wallet_id}/csv")
 def ledger_csv(
     wallet_id: int,
@@ -185,56 +409,54 @@ def ledger_csv(
     csv_sep: str = ";",  # ";" BR | "," US
     csv_decimal: str = "comma",  # "comma" BR | "dot" US
     filename: str | None = None,
-    db: Session = Depends(get_db),
 ):
     if WALLET_COL is None:
         raise HTTPException(500, "Modelo de transação não tem coluna wallet/ledger id")
 
-    q = db.query(TM).filter(wallet_id == WALLET_COL)
-    if tipo in ("CREDITO", "DEBITO"):
-        q = q.filter(tipo == TIPO_COL)
-
     ds, de = _parse_dt(start, False), _parse_dt(end, True)
-    if ds is not None:
-        q = q.filter(ds <= DATE_COL)
-    if de is not None:
-        q = q.filter(de >= DATE_COL)
-
     col = ORDER_MAP.get(order_by, DATE_COL)
-    q = q.order_by(desc(col) if order_dir.lower() == "desc" else asc(col))
-
-    rows = q.all()  # materializa (evita sessão fechar no meio)
+    stmt = _ledger_rows_stmt(wallet_id, tipo, ds, de, col, order_dir)
 
     sep = "," if csv_sep == "," else ";"
     use_comma = csv_decimal.lower() != "dot"  # default BR
 
-    buf = io.StringIO()
-    w = csv.writer(buf, delimiter=sep, quoting=csv.QUOTE_MINIMAL)
-    w.writerow(["id", "data", "tipo", "valor", "descricao"])
-
-    for t in rows:
-        dt = _get_attr(t, DATE_COL)
-        val = f"{float(getattr(t, getattr(VALOR_COL, 'key', 'valor'), 0) or 0):.2f}"
-        if use_comma:
-            val = val.replace(".", ",")
-        desc_txt = getattr(t, getattr(DESC_COL, "key", "referencia"), None)
-        if desc_txt is None:
-            desc_txt = getattr(t, "descricao", "") or ""
-        w.writerow(
-            [
-                getattr(t, "id", ""),
-                _fmt_dt(dt),
-                getattr(t, getattr(TIPO_COL, "key", "tipo"), "") or "",
-                val,
-                (desc_txt or "").replace("\n", " "),
-            ]
-        )
-
-    data = buf.getvalue().encode("utf-8")
     name = filename or f"extrato_wallet_{wallet_id}.csv"
     headers = {"Content-Disposition": f'attachment; filename="{name}"'}
-    return FastAPIResponse(
-        content=data, media_type="text/csv; charset=utf-8", headers=headers
+    return StreamingResponse(
+        _iter_csv(stmt, CSV_HEADER, _csv_row_formatter(use_comma), sep),
+        media_type="text/csv; charset=utf-8",
+        headers=headers,
+    )
+
+
+# ========= Export colunar (Parquet / Arrow IPC) =========
+@router.get("/ledger/{wallet_id}/columnar")
+def ledger_columnar(
+    wallet_id: int,
+    fmt: Literal["parquet", "arrow"] = "parquet",
+    tipo: str | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    order_by: str = "data",
+    order_dir: str = "desc",
+    filename: str | None = None,
+):
+    """Mesmos filtros do CSV, em Parquet (row groups) ou Arrow IPC stream (record batches)."""
+    if ledger_export.pa is None:
+        raise HTTPException(501, "export colunar indisponível: instale pyarrow")
+    if WALLET_COL is None:
+        raise HTTPException(500, "Modelo de transação não tem coluna wallet/ledger id")
+
+    ds, de = _parse_dt(start, False), _parse_dt(end, True)
+    col = ORDER_MAP.get(order_by, DATE_COL)
+    stmt = _ledger_rows_stmt(wallet_id, tipo, ds, de, col, order_dir)
+
+    media_type, ext = ledger_export.FORMATS[fmt]
+    name = filename or f"extrato_wallet_{wallet_id}.{ext}"
+    return StreamingResponse(
+        ledger_export.iter_columnar(SessionLocal, stmt, fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}"'},
     )
 
 
@@ -251,23 +473,7 @@ def _set_totais_headers(
       - X-Total-Debito
       - X-Total-Saldo
     """
-    q = db.query(
-        func.coalesce(
-            func.sum(case((TM.tipo == "CREDITO", TM.valor), else_=0)), 0
-        ).label("credito"),
-        func.coalesce(
-            func.sum(case((TM.tipo == "DEBITO", TM.valor), else_=0)), 0
-        ).label("debito"),
-    ).filter(TM.wallet_id == wallet_id)
-
-    if dt_ini is not None:
-        q = q.filter(TM.criado_em >= dt_ini)
-    if dt_fim is not None:
-        q = q.filter(TM.criado_em <= dt_fim)
-
-    r = q.one()
-    credito = float(r.credito or 0)
-    debito = float(r.debito or 0)
+    _, credito, debito = range_totals(db, wallet_id, dt_ini, dt_fim)
     saldo = credito - debito
 
     response.headers["X-Total-Credito"] = f"{credito:.2f}"
@@ -277,30 +483,14 @@ def _set_totais_headers(
 
 # =======================================================================
 @router.get("/ledger/{ledger_id}/export")
-def export_ledger_csv(ledger_id: int, db: Session = Depends(get_db)):
-    # imports locais pra não mexer no topo do arquivo
-    import csv
-    import io
-
-    from fastapi.responses import StreamingResponse
-
-    # Busca transações da carteira
-    rows = db.query(TM).filter(ledger_id == WALLET_COL).order_by(DATE_COL.desc()).all()
-
-    # Monta CSV em memória
-    buf = io.StringIO()
-    w = csv.writer(buf)
-    w.writerow(["ID", "Data", "Descrição", "Tipo", "Valor"])
-    for r in rows:
-        data = getattr(r, "criado_em", getattr(r, "data", None))
-        desc = getattr(r, "referencia", getattr(r, "descricao", getattr(r, "memo", "")))
-        tipo = getattr(r, "tipo", getattr(r, "kind", ""))
-        valor = getattr(r, "valor", getattr(r, "amount", 0))
-        w.writerow([r.id, data, desc, tipo, valor])
-
-    buf.seek(0)
+def export_ledger_csv(ledger_id: int):
+    stmt = _ledger_rows_stmt(ledger_id)
     return StreamingResponse(
-        buf,
+        _iter_csv(
+            stmt,
+            ["ID", "Data", "Descrição", "Tipo", "Valor"],
+            lambda r: [r.id, r.data, r.descricao, r.tipo, r.valor],
+        ),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename=ledger_{ledger_id}.csv"},
     )
@@ -1,18 +1,29 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
-from app.database.session import get_db
+from app.core.http_cache import make_etag, not_modified, validators
+from app.core.responses import FastJSONResponse
+from app.db.session import get_db
 from app.models.wallet import Wallet
+from app.services.ledger_service import wallets_version
 
 router = APIRouter()
 
 @router.get("/wallets")
-def list_wallets(db: Session = Depends(get_db)):
+def list_wallets(request: Request, db: Session = Depends(get_db)):
+    marcador, ultima_escrita = wallets_version(db)
+    etag = make_etag("wallets", *marcador)
+    # a contagem/maior id do ETag (ex.: carteira apagada) não aparece
+    # na data: só o ETag revalida a lista
+    cached = not_modified(request, etag, ultima_escrita, honor_ims=False)
+    if cached is not None:
+        return cached
+
     rows = (
         db.query(Wallet.id, Wallet.user_id, Wallet.saldo_atual, Wallet.criado_em)
           .order_by(Wallet.id.asc())
           .all()
     )
-    return [
+    return FastJSONResponse([
         {
             "id": r.id,
             "user_id": r.user_id,
@@ -20,4 +31,4 @@ def list_wallets(db: Session = Depends(get_db)):
             "criado_em": r.criado_em.isoformat() if r.criado_em else None,
         }
         for r in rows
-    ]
+    ], headers=validators(etag, ultima_escrita))
@@ -1,16 +1,20 @@
 import hmac, hashlib, json
 from fastapi import APIRouter, Header, HTTPException, Depends, status, Request
-from sqlalchemy.orm import Session
-from decimal import Decimal
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.session import get_db
-from app.models.pix_invoice import PixInvoice
-from app.models.wallet import Wallet
-from app.models.transaction import Transaction
+from app.db.session import get_async_db
+from app.services.psp_service import apply_batch, apply_one, enqueue, parse_item
 
 router = APIRouter()
 
+# Resultado por item -> erro HTTP da rota unitária (None = 204)
+_SINGLE_ERRORS = {
+    "not_found": (status.HTTP_404_NOT_FOUND, "Invoice not found"),
+    "not_confirmed": (status.HTTP_400_BAD_REQUEST, "Payment not confirmed"),
+    "wallet_not_found": (status.HTTP_404_NOT_FOUND, "Wallet not found"),
+}
+
 def verify_hmac(raw_body: bytes, signature: str | None) -> None:
     if not signature:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Missing signature")
@@ -22,47 +26,61 @@ def verify_hmac(raw_body: bytes, signature: str | None) -> None:
 async def psp_pix_webhook(
     request: Request,
     x_signature: str | None = Header(default=None, alias="X-Signature"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     raw = await request.body()
     verify_hmac(raw, x_signature)
 
     try:
-        payload = json.loads(raw.decode())
-        txid = payload["txid"]
-        valor = Decimal(str(payload["valor"]))
-        status_psp = payload.get("status", "CONFIRMED")
+        txid, valor, status_psp = parse_item(json.loads(raw.decode()))
     except Exception:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid payload")
 
-    inv = db.query(PixInvoice).filter(PixInvoice.txid == txid).first()
-    if not inv:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, "Invoice not found")
-
-    # Idempotência
-    if inv.status == "CONFIRMED":
+    if settings.WEBHOOK_ASYNC_MODE:
+        # só persiste e confirma; os workers do inbox aplicam o crédito
+        await enqueue(db, raw.decode())
         return
 
-    if status_psp not in ("CONFIRMED", "PAID", "COMPLETED"):
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Payment not confirmed")
+    result = await apply_one(db, txid, valor, status_psp)
+    if result in _SINGLE_ERRORS:
+        raise HTTPException(*_SINGLE_ERRORS[result])
+    return
 
-    w = db.query(Wallet).filter(Wallet.user_id == inv.user_id).first()
-    if not w:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, "Wallet not found")
 
-    ref = f"pix:{txid}"
-    exists_tx = db.query(Transaction).filter(
-        Transaction.wallet_id == w.id,
-        Transaction.referencia == ref
-    ).first()
-    if exists_tx:
-        inv.status = "CONFIRMED"
-        db.add(inv); db.commit()
-        return
+# ========= Lote (arquivo de liquidação do PSP) =========
+def _parse_batch(raw: bytes, content_type: str) -> list:
+    """Array JSON, {"items": [...]} ou NDJSON (um objeto por linha)."""
+    text = raw.decode()
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("items")
+    if not isinstance(data, list):
+        raise ValueError("esperado array de confirmações")
+    return data
+
+@router.post("/webhooks/psp/pix/batch")
+async def psp_pix_webhook_batch(
+    request: Request,
+    x_signature: str | None = Header(default=None, alias="X-Signature"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Confirmações em lote: HMAC uma vez sobre o corpo inteiro, cargas em bulk
+    (cobranças, carteiras, chaves de idempotência) e um único commit.
+    Responde o resultado de cada item, na ordem recebida.
+    """
+    raw = await request.body()
+    verify_hmac(raw, x_signature)
+    try:
+        items = _parse_batch(raw, (request.headers.get("content-type") or "").lower())
+    except Exception:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid payload")
 
-    w.saldo_atual = (w.saldo_atual or 0) + valor
-    tx = Transaction(wallet_id=w.id, tipo="CREDITO", valor=valor, referencia=ref)
+    results = await apply_batch(db, items)
 
-    inv.status = "CONFIRMED"
-    db.add_all([w, tx, inv]); db.commit()
-    return
+    summary: dict[str, int] = {}
+    for r in results:
+        summary[r["result"]] = summary.get(r["result"], 0) + 1
+    return {"summary": summary, "results": results}
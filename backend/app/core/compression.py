@@ -0,0 +1,157 @@
+# backend/app/core/compression.py
+"""
+Compressão negociada (Accept-Encoding) para as rotas de listagem/export.
+
+ASGI puro e em streaming: cada chunk do corpo é comprimido e enviado na hora
+(flush por chunk), então o CSV/JSON grande continua saindo aos poucos, sem
+bufferizar a resposta inteira. zstd quando o cliente aceita e o pacote
+`zstandard` está instalado; senão gzip.
+"""
+from __future__ import annotations
+
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # dependência opcional
+    zstandard = None
+
+# Tipos que valem a pena; Parquet/Arrow já saem comprimidos (zstd)
+COMPRESSIBLE = ("text/", "application/json")
+
+
+def _accepted(header: str) -> dict[str, float]:
+    out = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            out[name.strip().lower()] = q
+    return out
+
+
+def negotiate(accept_encoding: str, zstd_ok: bool = True) -> str | None:
+    acc = _accepted(accept_encoding)
+    star = acc.get("*", 0.0)
+    options = (["zstd"] if zstd_ok and zstandard is not None else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for enc in options:  # empate: zstd ganha (ordem)
+        q = acc.get(enc, star)
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._c = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = container gzip
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._c.compress(data) + self._c.flush(zlib.Z_FINISH)
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._c = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._c.compress(data) + self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._c.compress(data) + self._c.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def make_compressor(encoding: str, gzip_level: int, zstd_level: int):
+    return _Zstd(zstd_level) if encoding == "zstd" else _Gzip(gzip_level)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        *,
+        paths: tuple[str, ...] = ("/api/",),
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        zstd_level: int = 3,
+    ):
+        self.app = app
+        self.paths = paths
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            return await self.app(scope, receive, send)
+        accept = ""
+        for k, v in scope["headers"]:
+            if k == b"accept-encoding":
+                accept = v.decode("latin-1")
+                break
+        encoding = negotiate(accept) if accept else None
+        if encoding is None:
+            return await self.app(scope, receive, send)
+        await self.app(scope, receive, _Responder(self, encoding, send).send)
+
+
+class _Responder:
+    def __init__(self, mw: CompressionMiddleware, encoding: str, send):
+        self.mw = mw
+        self.encoding = encoding
+        self._send = send
+        self.start = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _should_compress(self, first_body: bytes, more_body: bool) -> bool:
+        headers = {k.lower(): v for k, v in self.start["headers"]}
+        if b"content-encoding" in headers:
+            return False
+        ctype = headers.get(b"content-type", b"").decode("latin-1").lower()
+        if not ctype.startswith(COMPRESSIBLE):
+            return False
+        # corpo único e pequeno: não compensa
+        return more_body or len(first_body) >= self.mw.minimum_size
+
+    async def send(self, message):
+        kind = message["type"]
+        if kind == "http.response.start":
+            self.start = message
+            return
+        if kind != "http.response.body" or self.passthrough:
+            return await self._send(message)
+
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not self._should_compress(body, more):
+                self.passthrough = True
+                await self._send(self.start)
+                return await self._send(message)
+            self.compressor = make_compressor(self.encoding, self.mw.gzip_level, self.mw.zstd_level)
+            headers = [
+                (k, v) for k, v in self.start["headers"] if k.lower() not in (b"content-length", b"vary")
+            ]
+            vary = [v for k, v in self.start["headers"] if k.lower() == b"vary"]
+            headers.append((b"content-encoding", self.encoding.encode()))
+            headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+            if not more:
+                data = self.compressor.finish(body)
+                headers.append((b"content-length", str(len(data)).encode()))
+                await self._send({**self.start, "headers": headers})
+                return await self._send({"type": "http.response.body", "body": data})
+            await self._send({**self.start, "headers": headers})
+
+        data = self.compressor.chunk(body) if more else self.compressor.finish(body)
+        await self._send({"type": "http.response.body", "body": data, "more_body": more})
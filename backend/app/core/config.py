@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 import os
+import tempfile
 
 class Settings(BaseModel):
     ENV: str = os.getenv("ENV", "dev")
@@ -9,5 +10,41 @@ class Settings(BaseModel):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
     WEBHOOK_SECRET: str = os.getenv("WEBHOOK_SECRET", "dev")
     IDEMP_CACHE_TTL_SECONDS: int = int(os.getenv("IDEMP_CACHE_TTL_SECONDS", "86400"))
+    # Pool de conexões (um engine só por processo; ver app/db/session.py)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # segundos esperando conexão
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # segundos; -1 desliga
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 = sem limite (Postgres)
+    # Perfil SQLite aplicado em cada conexão (WAL, synchronous=NORMAL, cache, mmap...)
+    SQLITE_TUNING: bool = os.getenv("SQLITE_TUNING", "1") == "1"
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+    SQLITE_MMAP_SIZE_MB: int = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    # Webhook PIX em modo inbox: a rota só grava e responde 204; workers aplicam em lote
+    WEBHOOK_ASYNC_MODE: bool = os.getenv("WEBHOOK_ASYNC_MODE", "0") == "1"
+    WEBHOOK_WORKERS: int = int(os.getenv("WEBHOOK_WORKERS", "2"))
+    WEBHOOK_INBOX_BATCH: int = int(os.getenv("WEBHOOK_INBOX_BATCH", "500"))
+    WEBHOOK_INBOX_POLL_MS: int = int(os.getenv("WEBHOOK_INBOX_POLL_MS", "200"))
+    WEBHOOK_INBOX_LEASE_SECONDS: int = int(os.getenv("WEBHOOK_INBOX_LEASE_SECONDS", "60"))
+    WEBHOOK_INBOX_MAX_TENTATIVAS: int = int(os.getenv("WEBHOOK_INBOX_MAX_TENTATIVAS", "5"))
+    LEDGER_BULK_MAX: int = int(os.getenv("LEDGER_BULK_MAX", "50000"))  # lançamentos por POST /ledger/{id}/entries
+    BALANCE_CHECKPOINT_EVERY_S: int = int(os.getenv("BALANCE_CHECKPOINT_EVERY_S", "3600"))  # 0 desliga
+    # Compressão negociada (gzip / zstd) das rotas de listagem e export
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "1") == "1"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes (corpo não-streaming)
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "6"))
+    ZSTD_LEVEL: int = int(os.getenv("ZSTD_LEVEL", "3"))
+    # Jobs de export (POST /exports): arquivos locais, reaproveitados dentro do TTL
+    EXPORT_DIR: str = os.getenv("EXPORT_DIR", os.path.join(tempfile.gettempdir(), "dilspay_exports"))
+    EXPORT_WORKERS: int = int(os.getenv("EXPORT_WORKERS", "2"))
+    EXPORT_JOB_TTL_SECONDS: int = int(os.getenv("EXPORT_JOB_TTL_SECONDS", "3600"))
+    # Cache de resultado do GET /ledger/{id}: memory | redis | local | off
+    RESULT_CACHE_BACKEND: str = os.getenv("RESULT_CACHE_BACKEND", "memory")
+    RESULT_CACHE_URL: str = os.getenv("RESULT_CACHE_URL", "")  # ex.: redis://localhost:6379/0
+    RESULT_CACHE_SIZE: int = int(os.getenv("RESULT_CACHE_SIZE", "1024"))  # entradas (backend memory)
+    RESULT_CACHE_TTL_SECONDS: int = int(os.getenv("RESULT_CACHE_TTL_SECONDS", "300"))
+    RESULT_CACHE_TIMEOUT_MS: int = int(os.getenv("RESULT_CACHE_TIMEOUT_MS", "100"))  # socket do backend externo; estourou = miss
+    INDEX_CHECK_ON_STARTUP: bool = os.getenv("INDEX_CHECK_ON_STARTUP", "0") == "1"
 
 settings = Settings()
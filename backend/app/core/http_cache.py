@@ -0,0 +1,75 @@
+# backend/app/core/http_cache.py
+"""
+Validação HTTP (ETag / Last-Modified) pras leituras do ledger.
+
+O ETag sai de um marcador barato (versão da carteira + parâmetros da consulta),
+então a rota responde 304 antes de rodar as queries de página e totais.
+ETags são fracos (W/): o corpo pode ir comprimido ou não pelo middleware.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"  # o browser guarda, mas sempre revalida
+
+
+def make_etag(*parts) -> str:
+    raw = "|".join(str(p) for p in parts)
+    return 'W/"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def query_fingerprint(request: Request) -> str:
+    """Parâmetros da consulta em ordem estável (mesma consulta = mesmo ETag)."""
+    return "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    # comparação fraca (RFC 9110 13.1.2)
+    return any(t.strip().removeprefix("W/") == opaque for t in header.split(","))
+
+
+def _http_date(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)  # SQLite devolve naive (gravado em UTC)
+    return format_datetime(dt.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def validators(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    return headers
+
+
+def not_modified(
+    request: Request, etag: str, last_modified: datetime | None, honor_ims: bool = True
+) -> Response | None:
+    """
+    304 se o cliente já tem essa versão; None = seguir com a consulta.
+    `honor_ims=False`: a data não cobre tudo que o ETag cobre (ex.: carteira apagada),
+    então If-Modified-Since sozinho nunca dá 304.
+    """
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        fresh = _etag_matches(inm, etag)
+    elif not honor_ims:
+        fresh = False
+    else:
+        # If-Modified-Since só vale sem If-None-Match
+        ims = request.headers.get("if-modified-since")
+        fresh = False
+        if ims and last_modified is not None:
+            try:
+                fresh = parsedate_to_datetime(ims) >= parsedate_to_datetime(_http_date(last_modified))
+            except (TypeError, ValueError):
+                fresh = False
+    if not fresh:
+        return None
+    return Response(status_code=304, headers=validators(etag, last_modified))
@@ -0,0 +1,98 @@
+# backend/app/core/password_pool.py
+"""
+Pool dedicado e limitado para hash/verificação de senha (bcrypt ~100ms+ de CPU).
+
+Tira o bcrypt do event loop: as rotas async fazem `await password_pool.run(fn, ...)`.
+O pool tem `workers` threads (o bcrypt solta o GIL durante o hash) e aceita no
+máximo `workers + queue` tarefas ao mesmo tempo; acima disso recusa na hora com
+`PoolSaturated` (a rota responde 503 + Retry-After) em vez de acumular fila.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_POOL_QUEUE = int(os.getenv("PASSWORD_POOL_QUEUE", "64"))
+
+
+class PoolSaturated(RuntimeError):
+    """Pool de senhas cheio (workers ocupados e fila no limite)."""
+
+
+class PasswordPool:
+    def __init__(self, workers: int = PASSWORD_POOL_WORKERS, queue: int = PASSWORD_POOL_QUEUE):
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self.workers = 0
+        self.queue = 0
+        self.in_flight = 0  # aceitas e ainda não concluídas (rodando + na fila)
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total_s = 0.0
+        self.wait_max_s = 0.0
+        self.run_total_s = 0.0
+        self.configure(workers, queue)
+
+    def configure(self, workers: int, queue: int) -> None:
+        """(Re)cria o executor. workers=0 roda no próprio chamador (comportamento antigo)."""
+        with self._lock:
+            old, self._executor = self._executor, None
+            self.workers, self.queue = workers, queue
+            if workers > 0:
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwd")
+        if old is not None:
+            old.shutdown(wait=False)
+
+    def _call(self, submitted: float, fn, args):
+        started = time.perf_counter()
+        with self._lock:
+            self.running += 1
+            waited = started - submitted
+            self.wait_total_s += waited
+            self.wait_max_s = max(self.wait_max_s, waited)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.run_total_s += time.perf_counter() - started
+
+    async def run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+        with self._lock:
+            if self.in_flight >= self.workers + self.queue:
+                self.rejected += 1
+                raise PoolSaturated("pool de senhas saturado")
+            self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._call, time.perf_counter(), fn, args)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            done = self.completed
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue,
+                "in_flight": self.in_flight,
+                "running": self.running,
+                "queued": max(0, self.in_flight - self.running),
+                "completed": done,
+                "rejected": self.rejected,
+                "wait_avg_ms": round(self.wait_total_s / done * 1000, 3) if done else 0.0,
+                "wait_max_ms": round(self.wait_max_s * 1000, 3),
+                "run_avg_ms": round(self.run_total_s / done * 1000, 3) if done else 0.0,
+            }
+
+
+password_pool = PasswordPool()
@@ -0,0 +1,79 @@
+# backend/app/core/responses.py
+"""
+Resposta JSON padrão da API: usa orjson quando instalado e cai no json da stdlib.
+
+A saída é a mesma do JSONResponse do Starlette (compacta, UTF-8, sem escapar
+acentos), com as conversões do jsonable_encoder para Decimal/datetime/UUID, e
+NaN/Infinity são recusados (ValueError) como lá. Única diferença conhecida: com
+orjson, float em notação científica sai como `1e16`/`1e-7` em vez de
+`1e+16`/`1e-07` (mesmo valor). scripts/check_json_response.py confere.
+Rotas quentes podem devolver `FastJSONResponse(...)` direto pra pular o
+jsonable_encoder do FastAPI.
+"""
+from __future__ import annotations
+
+import json
+import math
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    # mesmas regras do fastapi.encoders (decimal_encoder, isoformat, str)
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _check_finite(obj: Any) -> None:
+    if isinstance(obj, float):
+        if not math.isfinite(obj):
+            raise ValueError("Out of range float values are not JSON compliant")
+    elif isinstance(obj, dict):
+        for k, v in obj.items():
+            _check_finite(k)
+            _check_finite(v)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for v in obj:
+            _check_finite(v)
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        try:
+            out = orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # ex.: int > 64 bits; a stdlib resolve
+        else:
+            if b"null" in out:
+                # orjson escreve NaN/Infinity como null; o Starlette (allow_nan=False) recusa
+                _check_finite(content)
+            return out
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
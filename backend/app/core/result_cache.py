@@ -0,0 +1,296 @@
+# backend/app/core/result_cache.py
+"""
+Cache de resultado das consultas do ledger (página + totais + saldos), chave =
+(carteira, versão da carteira, filtros/ordem/página).
+
+A versão (wallet_versions) sobe na mesma transação de qualquer escrita em
+`transactions`, então uma entrada velha nunca é servida, nem entre processos.
+Além disso, o commit que escreveu lançamentos apaga na hora as entradas da
+carteira (listener after_commit), pra não ocupar espaço até o TTL.
+
+Backends de rede (`blocking`) nunca rodam no event loop: leitura/escrita vão
+pra uma thread (`aget`/`aput`) com timeout curto de socket (erro/timeout = miss),
+e a invalidação pós-commit vai pra uma thread de fundo.
+
+Backends:
+  memory -> LRU em processo (padrão)
+  redis  -> externo, compartilhado entre workers (precisa do pacote `redis`)
+  local  -> o backend externo sobre um KV em memória (testes, sem servidor)
+  off    -> desligado
+"""
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+_WRITTEN_KEY = "result_cache_wallets"  # session.info: carteiras com lançamento novo nesta transação
+
+
+class MemoryBackend:
+    """LRU com TTL, thread-safe. Guarda os objetos direto (sem serializar)."""
+
+    blocking = False
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._data: OrderedDict[str, tuple[float, object]] = OrderedDict()  # chave -> (expira, valor)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value, ttl_s: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_s, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [k for k in self._data if k.startswith(prefix)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class LocalKV:
+    """Subconjunto do cliente redis (get/set ex/delete/scan_iter) em memória."""
+
+    def __init__(self):
+        self._data: dict[str, tuple[float | None, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str):
+        with self._lock:
+            item = self._data.get(name)
+            if item is None:
+                return None
+            if item[0] is not None and item[0] <= time.monotonic():
+                del self._data[name]
+                return None
+            return item[1]
+
+    def set(self, name: str, value: bytes, ex: int | None = None) -> bool:
+        with self._lock:
+            self._data[name] = (time.monotonic() + ex if ex else None, value)
+        return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(n, None) is not None for n in names)
+
+    def scan_iter(self, match: str = "*", count: int | None = None):
+        with self._lock:
+            keys = [k for k in self._data if fnmatch.fnmatchcase(k, match)]
+        yield from keys
+
+    def dbsize(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class RedisBackend:
+    """Backend externo: valores em JSON, TTL no próprio servidor."""
+
+    def __init__(self, client, namespace: str = "dilspay:", blocking: bool = True):
+        self.client = client
+        self.namespace = namespace
+        self.blocking = blocking  # False só no KV local (sem rede)
+
+    def get(self, key: str):
+        raw = self.client.get(self.namespace + key)
+        if raw is None:
+            return None
+        body, headers = json.loads(raw)
+        return body.encode("utf-8"), headers
+
+    def set(self, key: str, value, ttl_s: int) -> None:
+        body, headers = value
+        self.client.set(self.namespace + key, json.dumps([body.decode("utf-8"), headers]), ex=ttl_s)
+
+    def delete_prefix(self, prefix: str) -> int:
+        keys = list(self.client.scan_iter(match=self.namespace + prefix + "*", count=500))
+        return self.client.delete(*keys) if keys else 0
+
+    def size(self) -> int | None:
+        try:
+            return self.client.dbsize()
+        except Exception:
+            return None
+
+
+def make_backend(kind: str, url: str = "", max_items: int = 1024, timeout_s: float = 0.1):
+    kind = (kind or "off").lower()
+    if kind == "memory":
+        return MemoryBackend(max_items)
+    if kind == "local":
+        return RedisBackend(LocalKV(), blocking=False)
+    if kind == "redis":
+        if redis is None or not url:
+            print("[CACHE] backend redis indisponível (pacote ou RESULT_CACHE_URL); usando memória")
+            return MemoryBackend(max_items)
+        return RedisBackend(
+            redis.Redis.from_url(url, socket_timeout=timeout_s, socket_connect_timeout=timeout_s)
+        )
+    return None
+
+
+class ResultCache:
+    """Fachada com contadores; falha do backend vira miss (nunca derruba a rota)."""
+
+    def __init__(self, backend=None, ttl_s: int = 300):
+        self.backend = backend
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+        self.errors = 0
+        self._bg: ThreadPoolExecutor | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl_s > 0
+
+    @staticmethod
+    def key(wallet_id: int, versao: int, fingerprint: str) -> str:
+        return f"ledger:{wallet_id}:{versao}:" + hashlib.sha1(fingerprint.encode()).hexdigest()
+
+    def _bump(self, attr: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + n)
+
+    def get(self, wallet_id: int, versao: int, fingerprint: str):
+        """(corpo, headers) ou None."""
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(self.key(wallet_id, versao, fingerprint))
+        except Exception:
+            self._bump("errors")
+            value = None
+        self._bump("hits" if value is not None else "misses")
+        return value
+
+    def put(self, wallet_id: int, versao: int, fingerprint: str, body: bytes, headers: dict) -> None:
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(self.key(wallet_id, versao, fingerprint), (body, headers), self.ttl_s)
+            self._bump("stores")
+        except Exception:
+            self._bump("errors")
+
+    @property
+    def _blocking(self) -> bool:
+        return getattr(self.backend, "blocking", False)
+
+    async def aget(self, wallet_id: int, versao: int, fingerprint: str):
+        """`get` pra rotas async: backend de rede roda numa thread, fora do event loop."""
+        if self.enabled and self._blocking:
+            return await asyncio.to_thread(self.get, wallet_id, versao, fingerprint)
+        return self.get(wallet_id, versao, fingerprint)
+
+    async def aput(self, wallet_id: int, versao: int, fingerprint: str, body: bytes, headers: dict) -> None:
+        if self.enabled and self._blocking:
+            await asyncio.to_thread(self.put, wallet_id, versao, fingerprint, body, headers)
+        else:
+            self.put(wallet_id, versao, fingerprint, body, headers)
+
+    def invalidate_wallet_later(self, wallet_id: int) -> None:
+        """Invalidação pós-commit: backend de rede vai pra thread de fundo (a versão na chave já garante)."""
+        if not self.enabled:
+            return
+        if not self._blocking:
+            self.invalidate_wallet(wallet_id)
+            return
+        with self._lock:
+            if self._bg is None:
+                self._bg = ThreadPoolExecutor(max_workers=1, thread_name_prefix="result-cache")
+        self._bg.submit(self.invalidate_wallet, wallet_id)
+
+    def invalidate_wallet(self, wallet_id: int) -> int:
+        if not self.enabled:
+            return 0
+        try:
+            n = self.backend.delete_prefix(f"ledger:{wallet_id}:")
+        except Exception:
+            self._bump("errors")
+            return 0
+        self._bump("invalidations", n)
+        return n
+
+    def stats(self) -> dict:
+        try:
+            size = self.backend.size() if self.backend is not None else 0
+        except Exception:
+            size = None
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__ if self.backend is not None else None,
+                "size": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "stores": self.stores,
+                "invalidations": self.invalidations,
+                "errors": self.errors,
+            }
+
+
+result_cache = ResultCache(
+    make_backend(
+        settings.RESULT_CACHE_BACKEND,
+        settings.RESULT_CACHE_URL,
+        settings.RESULT_CACHE_SIZE,
+        settings.RESULT_CACHE_TIMEOUT_MS / 1000,
+    ),
+    settings.RESULT_CACHE_TTL_SECONDS,
+)
+
+
+def mark_wallet_written(session: Session, wallet_id: int) -> None:
+    """Marca a carteira pra ter o cache limpo quando esta transação commitar."""
+    session.info.setdefault(_WRITTEN_KEY, set()).add(wallet_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for wallet_id in session.info.pop(_WRITTEN_KEY, ()):
+        result_cache.invalidate_wallet_later(wallet_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop(_WRITTEN_KEY, None)
@@ -1,11 +1,17 @@
 # backend/app/core/security.py
 from __future__ import annotations
 
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 import jwt  # PyJWT
 from passlib.context import CryptContext
 
+from app.core.password_pool import password_pool
+
 # -------------------- Config via ENV --------------------
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 
@@ -16,8 +22,53 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15")
 REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY", SECRET_KEY)
 REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", "43200"))  # 30 dias
 
+# Cache de claims já verificados (0 desliga)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
 # -------------------- Password hashing --------------------
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# PASSWORD_SCHEME: bcrypt (padrão) ou argon2 (requer argon2-cffi). Hashes de outro
+# esquema ou com custo diferente do configurado continuam válidos e são refeitos
+# no próximo login bem-sucedido (needs_update).
+PASSWORD_SCHEME = os.getenv("PASSWORD_SCHEME", "bcrypt")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST_KB = int(os.getenv("ARGON2_MEMORY_COST_KB", "19456"))  # 19 MiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+
+def _argon2_available() -> bool:
+    try:
+        from passlib.hash import argon2
+        return argon2.has_backend()
+    except Exception:
+        return False
+
+def make_pwd_context(
+    scheme: str = PASSWORD_SCHEME,
+    *,
+    bcrypt_rounds: int = BCRYPT_ROUNDS,
+    argon2_time_cost: int = ARGON2_TIME_COST,
+    argon2_memory_cost_kb: int = ARGON2_MEMORY_COST_KB,
+    argon2_parallelism: int = ARGON2_PARALLELISM,
+) -> CryptContext:
+    """CryptContext com `scheme` como padrão; os demais esquemas só verificam (deprecated)."""
+    # min = max = custo configurado: hash com custo diferente (maior ou menor) é refeito
+    opts = dict(bcrypt__rounds=bcrypt_rounds, bcrypt__min_rounds=bcrypt_rounds, bcrypt__max_rounds=bcrypt_rounds)
+    schemes = ["bcrypt"]
+    if _argon2_available():
+        schemes.append("argon2")
+        opts.update(
+            argon2__time_cost=argon2_time_cost,
+            argon2__memory_cost=argon2_memory_cost_kb,
+            argon2__parallelism=argon2_parallelism,
+        )
+    if scheme not in schemes:
+        print(f"[AUTH] esquema de senha '{scheme}' indisponível, usando bcrypt")
+        scheme = "bcrypt"
+    return CryptContext(
+        schemes=[scheme] + [x for x in schemes if x != scheme], default=scheme, deprecated="auto", **opts
+    )
+
+pwd_context = make_pwd_context()
 
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
@@ -25,6 +76,21 @@ def verify_password(plain: str, hashed: str) -> bool:
 def hash_password(plain: str) -> str:
     return pwd_context.hash(plain)
 
+def verify_and_update(plain: str, hashed: str) -> tuple[bool, str | None]:
+    """Verifica e, se o hash estiver desatualizado (needs_update), devolve o novo hash."""
+    return pwd_context.verify_and_update(plain, hashed)
+
+# Versões async: rodam no pool limitado (app/core/password_pool.py), fora do event loop.
+# Podem levantar PoolSaturated.
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await password_pool.run(verify_password, plain, hashed)
+
+async def verify_and_update_async(plain: str, hashed: str) -> tuple[bool, str | None]:
+    return await password_pool.run(verify_and_update, plain, hashed)
+
+async def hash_password_async(plain: str) -> str:
+    return await password_pool.run(hash_password, plain)
+
 # -------------------- JWT helpers --------------------
 def _now() -> datetime:
     return datetime.now(timezone.utc)
@@ -57,10 +123,75 @@ def create_refresh_token(*, sub: str, extra: dict | None = None, minutes: int |
         payload.update(extra)
     return jwt.encode(payload, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
 
-def decode_token(token: str, *, expect: str = "access") -> dict:
-    """Decodifica e valida tipo do token ('access' ou 'refresh')."""
+class ClaimsCache:
+    """
+    LRU de claims já verificados, chave = sha256 do token (o token em si não fica
+    em memória). Cada item sai no `exp` do próprio token. Thread-safe.
+    """
+
+    def __init__(self, max_items: int = TOKEN_CACHE_SIZE):
+        self.max_items = max_items
+        self._data: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()  # digest -> (exp, claims)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str, expect: str) -> bytes:
+        return hashlib.sha256(f"{expect}:{token}".encode()).digest()
+
+    def get(self, key: bytes) -> dict | None:
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key: bytes, claims: dict) -> None:
+        exp = claims.get("exp")
+        if self.max_items <= 0 or not isinstance(exp, (int, float)):
+            return  # sem exp não dá pra saber quando invalidar: não cacheia
+        with self._lock:
+            self._data[key] = (float(exp), claims)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+claims_cache = ClaimsCache()
+
+def _decode(token: str, expect: str) -> dict:
     key = REFRESH_SECRET_KEY if expect == "refresh" else SECRET_KEY
     data = jwt.decode(token, key, algorithms=[ALGORITHM])
     if data.get("type") != expect:
         raise jwt.InvalidTokenError("wrong token type")
     return data
+
+def decode_token(token: str, *, expect: str = "access") -> dict:
+    """Decodifica e valida tipo do token ('access' ou 'refresh'). Tokens já verificados vêm do cache até o exp."""
+    ck = ClaimsCache.digest(token, expect)
+    data = claims_cache.get(ck)
+    if data is None:
+        data = _decode(token, expect)
+        claims_cache.put(ck, data)
+    return dict(data)
@@ -1,5 +1,5 @@
 # app/database/init_db.py
-from app.database.session import engine
+from app.db.session import engine
 from app.db.base import Base
 
 def init_db() -> None:
@@ -7,6 +7,12 @@ def init_db() -> None:
     from app.models.user import User                  # noqa: F401
     from app.models.wallet import Wallet              # noqa: F401
     from app.models.transaction import Transaction    # noqa: F401
+    from app.models.wallet_daily_total import WalletDailyTotal
+    from app.models.idempotency_key import IdempotencyKey  # noqa: F401
+    from app.models.webhook_inbox import WebhookInbox      # noqa: F401
+    from app.models.wallet_balance_checkpoint import WalletBalanceCheckpoint  # noqa: F401
+    from app.models.export_job import ExportJob            # noqa: F401
+    from app.models.wallet_version import WalletVersion    # noqa: F401
     try:
         from app.models.pix import Pix                # noqa: F401
     except Exception:
@@ -21,3 +27,22 @@ def init_db() -> None:
         pass
 
     Base.metadata.create_all(bind=engine)
+
+    # create_all não mexe em tabelas que já existem: garante os índices compostos novos
+    for idx in Transaction.__table__.indexes:
+        try:
+            idx.create(bind=engine, checkfirst=True)
+        except Exception as e:
+            # ex.: referências duplicadas antigas impedem o índice único
+            print(f"[DB] índice {idx.name} não criado:", e)
+
+    # Backfill dos totais diários quando a tabela é nova e já existem lançamentos
+    from app.db.session import SessionLocal
+    from app.services.ledger_service import rebuild_daily_totals
+
+    db = SessionLocal()
+    try:
+        if db.query(WalletDailyTotal).first() is None and db.query(Transaction.id).first() is not None:
+            rebuild_daily_totals(db)
+    finally:
+        db.close()
@@ -0,0 +1,114 @@
+"""
+Confere com EXPLAIN se as queries do ledger (formatos do ORDER_MAP) usam índice.
+
+Relata os formatos que caem em full scan da tabela ou em sort fora do índice
+(filesort / "TEMP B-TREE"). Suporta SQLite e Postgres.
+
+Sorts aceitos (`_accepted_sort`) não contam como problema: ordenar o recorte de
+um período por outra coluna (nenhum índice serve range em criado_em e ordem em
+outra coluna ao mesmo tempo) e ordenar por descrição (texto livre; um índice só
+pra isso pesaria em toda escrita). Full scan nunca é aceito.
+
+CLI (a partir de backend/):
+    python -m app.db.index_advisor        # exit code 1 se achar problema
+"""
+from __future__ import annotations
+
+import json
+import sys
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+
+def _accepted_sort(order_by: str, periodo: bool) -> bool:
+    """Formato em que o sort fora do índice é esperado (ver docstring do módulo)."""
+    return order_by == "descricao" or (periodo and order_by != "data")
+
+
+def _query_shapes():
+    """(nome, order_by, período?, select) de cada formato de página do ledger."""
+    from app.api.v1.routes.ledger import ORDER_MAP, _ledger_rows_stmt
+
+    ds, de = datetime(2000, 1, 1), datetime(2000, 1, 31, 23, 59, 59)
+    for order_by, col in ORDER_MAP.items():
+        for tipo in (None, "CREDITO"):
+            for periodo in (False, True):
+                name = f"order_by={order_by}" + (" tipo" if tipo else "") + (" periodo" if periodo else "")
+                stmt = _ledger_rows_stmt(
+                    1, tipo, ds if periodo else None, de if periodo else None, col, "desc"
+                ).limit(10)
+                yield name, order_by, periodo, stmt
+
+
+def _explain_sqlite(conn, sql: str) -> tuple[list[str], list[str]]:
+    plan = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+    problems = []
+    for detail in plan:
+        d = detail.upper()
+        if d.startswith("SCAN") and "USING" not in d:
+            problems.append("full scan")
+        if "TEMP B-TREE" in d:
+            problems.append("filesort")
+    return problems, plan
+
+
+def _explain_postgres(conn, sql: str) -> tuple[list[str], list[str]]:
+    # Sem seqscan, pra tabela pequena não mascarar a falta de índice
+    conn.execute(text("SET LOCAL enable_seqscan = off"))
+    raw = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql).scalar()
+    doc = raw if isinstance(raw, list) else json.loads(raw)
+
+    problems, plan = [], []
+
+    def walk(node):
+        kind = node.get("Node Type", "")
+        plan.append(f"{kind} {node.get('Index Name') or node.get('Relation Name') or ''}".strip())
+        if kind == "Seq Scan":
+            problems.append("full scan")
+        elif kind in ("Sort", "Incremental Sort"):
+            problems.append("filesort")
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(doc[0]["Plan"])
+    return problems, plan
+
+
+def check_ledger_indexes(engine: Engine) -> list[dict]:
+    """Roda EXPLAIN em cada formato e devolve os que têm problema (fora os sorts aceitos)."""
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        explain = _explain_sqlite
+    elif dialect == "postgresql":
+        explain = _explain_postgres
+    else:
+        return [{"shape": "*", "problems": [f"dialeto '{dialect}' não suportado"], "plan": []}]
+
+    findings = []
+    with engine.connect() as conn:
+        for name, order_by, periodo, stmt in _query_shapes():
+            sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            with conn.begin():
+                problems, plan = explain(conn, sql)
+            if _accepted_sort(order_by, periodo):
+                problems = [p for p in problems if p != "filesort"]
+            if problems:
+                findings.append({"shape": name, "problems": sorted(set(problems)), "plan": plan})
+    return findings
+
+
+def report(engine: Engine) -> int:
+    findings = check_ledger_indexes(engine)
+    for f in findings:
+        print(f"[INDEX] {f['shape']}: {', '.join(f['problems'])}  ->  {' | '.join(f['plan'])}")
+    if not findings:
+        print("[INDEX] OK: todos os formatos do ledger usam índice (fora os sorts aceitos).")
+    return len(findings)
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    sys.exit(1 if report(engine) else 0)
@@ -0,0 +1,81 @@
+"""
+Pools com métricas de checkout/espera, pra exaustão do pool aparecer em /health/db.
+
+`MeteredQueuePool` (sync) e `MeteredAsyncQueuePool` (async) medem quanto tempo
+cada checkout esperou por uma conexão livre e quantos estouraram o pool_timeout.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waited = 0  # checkouts que não pegaram conexão na hora (> 1ms)
+        self.wait_total_s = 0.0
+        self.wait_max_s = 0.0
+
+    def record(self, waited_s: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            if waited_s > 0.001:
+                self.waited += 1
+            self.wait_total_s += waited_s
+            self.wait_max_s = max(self.wait_max_s, waited_s)
+
+    def snapshot(self, pool=None) -> dict:
+        with self._lock:
+            n = self.checkouts + self.timeouts
+            out = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "waited": self.waited,
+                "wait_avg_ms": round(self.wait_total_s / n * 1000, 3) if n else 0.0,
+                "wait_max_ms": round(self.wait_max_s * 1000, 3),
+            }
+        if isinstance(pool, QueuePool):
+            out.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+                idle=pool.checkedin(),
+            )
+        return out
+
+
+class _Metered:
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - t0, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - t0)
+        return conn
+
+    def recreate(self):
+        new = super().recreate()
+        new.metrics = self.metrics
+        return new
+
+
+class MeteredQueuePool(_Metered, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_Metered, AsyncAdaptedQueuePool):
+    pass
@@ -1,10 +1,15 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from app.core.config import settings
+from app.db.pool import MeteredAsyncQueuePool, MeteredQueuePool, PoolMetrics
+
 # Tenta várias variáveis de ambiente comuns
 DATABASE_URL = (
-    os.getenv("DATABASE_URL")
+    settings.DATABASE_URL
     or os.getenv("SQLALCHEMY_DATABASE_URI")
     or os.getenv("DB_URL")
     or os.getenv("DB_URI")
@@ -15,7 +20,6 @@ if not DATABASE_URL or not isinstance(DATABASE_URL, str) or DATABASE_URL.strip()
     DATABASE_URL = "sqlite:///./dev.db"
 
 # Ajustes específicos do SQLite
-connect_args = {}
 if DATABASE_URL.startswith("sqlite"):
     # cria diretório se for caminho relativo para arquivo
     try:
@@ -25,12 +29,93 @@ if DATABASE_URL.startswith("sqlite"):
             os.makedirs(dirpath, exist_ok=True)
     except Exception:
         pass
-    connect_args = {"check_same_thread": False}
 
 # Log discreto pra debug
 print(f"[DB] DATABASE_URL em uso: {DATABASE_URL}")
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args, pool_pre_ping=True)
+# Drivers assíncronos do mesmo banco: aiosqlite (SQLite) / asyncpg (Postgres)
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def _async_url(url: str):
+    u = make_url(url)
+    backend = u.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise RuntimeError(f"Sem driver async configurado para '{backend}'")
+    return u.set(drivername=_ASYNC_DRIVERS[backend])
+
+
+def sqlite_pragmas() -> list[str]:
+    """PRAGMAs do perfil de produção do SQLite (ver SQLITE_* em Settings)."""
+    return [
+        "PRAGMA journal_mode=WAL",  # leitores não bloqueiam o escritor (e vice-versa)
+        "PRAGMA synchronous=NORMAL",  # seguro com WAL; fsync só no checkpoint
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",  # negativo = KiB
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}",
+        "PRAGMA temp_store=MEMORY",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+    ]
+
+
+def apply_sqlite_profile(sync_engine) -> None:
+    """Aplica `sqlite_pragmas()` em toda conexão nova do engine (sync ou async)."""
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_conn, _rec):
+        cur = dbapi_conn.cursor()
+        try:
+            for p in pragmas:
+                cur.execute(p)
+        finally:
+            cur.close()
+
+
+def make_engine(url: str = DATABASE_URL, *, is_async: bool = False):
+    """
+    Fábrica única de engines (sync e async) com o pool configurado em Settings:
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_STATEMENT_TIMEOUT_MS.
+    O pool guarda métricas de checkout/espera em `engine.pool.metrics`.
+    """
+    u = _async_url(url) if is_async else make_url(url)
+    backend = u.get_backend_name()
+    kwargs = {"pool_pre_ping": True}
+    connect_args = {}
+
+    if backend == "sqlite":
+        if not is_async:
+            connect_args["check_same_thread"] = False
+        if u.database in (None, "", ":memory:"):
+            # banco em memória: pool padrão (uma conexão só), sem métricas nem perfil
+            return (create_async_engine if is_async else create_engine)(u, connect_args=connect_args)
+        connect_args["timeout"] = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+    elif backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            connect_args["server_settings"] = {"statement_timeout": timeout}
+        else:
+            connect_args["options"] = f"-c statement_timeout={timeout}"
+
+    kwargs.update(
+        poolclass=MeteredAsyncQueuePool if is_async else MeteredQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args=connect_args,
+    )
+    if is_async:
+        eng = create_async_engine(u, **kwargs)
+        eng.sync_engine.pool.metrics = PoolMetrics("async")
+    else:
+        eng = create_engine(u, **kwargs)
+        eng.pool.metrics = PoolMetrics("sync")
+    if backend == "sqlite" and settings.SQLITE_TUNING:
+        apply_sqlite_profile(eng.sync_engine if is_async else eng)
+    return eng
+
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
@@ -39,3 +124,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ---- Async (rotas quentes: ledger, extrato, webhook, login) ----
+async_engine = make_engine(is_async=True)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_metrics() -> dict:
+    """Métricas dos pools (sync e async) do processo."""
+    out = {}
+    for name, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        m = getattr(pool, "metrics", None)
+        out[name] = m.snapshot(pool) if m is not None else {"status": pool.status()}
+    return out
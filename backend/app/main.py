@@ -5,10 +5,12 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.responses import FastJSONResponse
+
 # -----------------------------------------------------------------------------
 # App
 # -----------------------------------------------------------------------------
-app = FastAPI(title="DilsPay API")
+app = FastAPI(title="DilsPay API", default_response_class=FastJSONResponse)
 
 # -----------------------------------------------------------------------------
 # CORS (dev) – porta do front 5501
@@ -45,9 +47,29 @@ app.add_middleware(
         "X-Total-Credito",
         "X-Total-Debito",
         "X-Total-Saldo",
+        "X-Saldo-Inicial",
+        "X-Saldo-Final",
+        "X-Next-Cursor",
+        "X-Prev-Cursor",
+        "ETag",
     ],
 )
 
+# -----------------------------------------------------------------------------
+# Compressão (gzip/zstd negociado) das listagens/exports, em streaming
+# -----------------------------------------------------------------------------
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings as _settings
+
+if _settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        paths=("/api/v1/ledger", "/api/v1/extrato", "/api/v1/wallets"),
+        minimum_size=_settings.COMPRESSION_MIN_SIZE,
+        gzip_level=_settings.GZIP_LEVEL,
+        zstd_level=_settings.ZSTD_LEVEL,
+    )
+
 # -----------------------------------------------------------------------------
 # Routers
 # -----------------------------------------------------------------------------
@@ -58,11 +80,40 @@ app.include_router(health.router, prefix="/api/v1", tags=["health"])
 app.include_router(ledger.router, prefix="/api/v1", tags=["ledger"])
 app.include_router(wallet_routes.router, prefix="/api/v1", tags=["wallet"])
 
+# export em background (worker pool + download com Range)
+from app.api.v1.routes import exports as export_routes
+from app.services.export_jobs import export_jobs as _export_jobs
+
+app.include_router(export_routes.router, prefix="/api/v1", tags=["exports"])
+
+
+@app.on_event("startup")
+def _resume_export_jobs():
+    try:
+        _export_jobs.resume()
+    except Exception as _e:  # tabela ainda não criada etc.
+        print("[EXPORT] jobs pendentes não retomados:", _e)
+
+
+@app.on_event("shutdown")
+def _stop_export_jobs():
+    _export_jobs.shutdown()
+
 # opcionais
 try:
     from app.api.v1.routes import auth
 
     app.include_router(auth.router, prefix="/api/v1", tags=["auth"])
+
+    @app.on_event("startup")
+    def _load_users_columns():
+        # descobre as colunas de 'users' uma vez; se a tabela ainda não existir, o 1º login tenta de novo
+        from app.db.session import engine as _engine
+
+        try:
+            auth.load_users_columns(_engine)
+        except Exception as _e:
+            print("[AUTH] colunas de users não carregadas:", _e)
 except Exception as e:
     print("⚠️ auth router pulado:", e)
 
@@ -74,7 +125,7 @@ except Exception:
     pass
 
 try:
-    from app.api.v1.routes import webhooks
+    from app.api.v1.webhooks import psp_pix as webhooks
 
     app.include_router(webhooks.router, prefix="/api/v1", tags=["webhooks"])
 except Exception:
@@ -87,6 +138,67 @@ try:
 except Exception:
     pass
 
+# -----------------------------------------------------------------------------
+# Index advisor (opcional): INDEX_CHECK_ON_STARTUP=1
+# -----------------------------------------------------------------------------
+try:
+    from app.core.config import settings
+
+    if settings.INDEX_CHECK_ON_STARTUP:
+        from app.db.session import engine as _engine
+        from app.db.index_advisor import report as _index_report
+
+        _index_report(_engine)
+except Exception as _e:
+    print("[INDEX] checagem não executada:", _e)
+
+# -----------------------------------------------------------------------------
+# Workers do inbox do webhook (opcional): WEBHOOK_ASYNC_MODE=1
+# -----------------------------------------------------------------------------
+try:
+    from app.core.config import settings
+
+    if settings.WEBHOOK_ASYNC_MODE:
+        from app.services.psp_service import inbox_workers
+
+        @app.on_event("startup")
+        async def _start_inbox_workers():
+            await inbox_workers.start()
+
+        @app.on_event("shutdown")
+        async def _stop_inbox_workers():
+            await inbox_workers.stop()
+except Exception as _e:
+    print("[INBOX] workers não iniciados:", _e)
+
+# -----------------------------------------------------------------------------
+# Checkpoints de saldo (saldo em T): BALANCE_CHECKPOINT_EVERY_S=0 desliga
+# -----------------------------------------------------------------------------
+try:
+    from app.core.config import settings
+
+    if settings.BALANCE_CHECKPOINT_EVERY_S > 0:
+        import asyncio as _asyncio
+
+        from app.services.ledger_service import checkpoint_loop
+
+        _cp_stop: _asyncio.Event | None = None
+        _cp_task: _asyncio.Task | None = None
+
+        @app.on_event("startup")
+        async def _start_checkpoints():
+            global _cp_stop, _cp_task
+            _cp_stop = _asyncio.Event()
+            _cp_task = _asyncio.create_task(checkpoint_loop(settings.BALANCE_CHECKPOINT_EVERY_S, _cp_stop))
+
+        @app.on_event("shutdown")
+        async def _stop_checkpoints():
+            if _cp_task is not None:
+                _cp_stop.set()
+                await _cp_task
+except Exception as _e:
+    print("[LEDGER] checkpoints de saldo não agendados:", _e)
+
 # -----------------------------------------------------------------------------
 # DEV token (para testes)
 # -----------------------------------------------------------------------------
@@ -0,0 +1,31 @@
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+class ExportJob(Base):
+    """
+    Export do ledger gerado em background num arquivo local.
+    PENDING -> RUNNING -> DONE | ERROR. Jobs iguais (mesma `chave`) dentro do TTL
+    reaproveitam o mesmo arquivo.
+    """
+    __tablename__ = "export_jobs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)  # uuid hex
+    chave: Mapped[str] = mapped_column(String(64), nullable=False)  # sha256 de wallet + filtros + formato
+    wallet_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    formato: Mapped[str] = mapped_column(String(16), nullable=False)
+    params: Mapped[str] = mapped_column(Text, nullable=False)  # JSON dos filtros
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="PENDING")
+    arquivo: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    tamanho: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    erro: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # Preenchidos no Python (UTC), como no inbox do webhook
+    criado_em: Mapped[str] = mapped_column(DateTime(timezone=True), nullable=False)
+    concluido_em: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    expira_em: Mapped[str] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # dedup: WHERE chave = ? AND expira_em > agora
+        Index("ix_export_jobs_chave_expira", "chave", "expira_em"),
+        Index("ix_export_jobs_expira_em", "expira_em"),
+    )
@@ -0,0 +1,11 @@
+from sqlalchemy import String, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+class IdempotencyKey(Base):
+    """Chave já processada (ex.: "pix:{txid}"). A PK única garante o exactly-once entre processos."""
+    __tablename__ = "idempotency_keys"
+
+    chave: Mapped[str] = mapped_column(String(128), primary_key=True)
+    expira_em: Mapped[str] = mapped_column(DateTime(timezone=True), index=True, nullable=False)
+    criado_em: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import ForeignKey, Numeric, DateTime, String, func
+from sqlalchemy import ForeignKey, Index, Numeric, DateTime, String, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base  # <- usa o mesmo DeclarativeBase
 
@@ -17,3 +17,24 @@ class Transaction(Base):
     valor: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
     referencia: Mapped[str] = mapped_column(String(255), default="", nullable=False)
     criado_em: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Formatos das queries de ledger/extrato (filtro wallet + tipo + período, ordem data/valor/id).
+    # Conferidos por app/db/index_advisor.py; init_db cria os que faltarem em bancos existentes.
+    __table_args__ = (
+        Index("ix_transactions_wallet_criado_id", "wallet_id", "criado_em", "id"),
+        Index("ix_transactions_wallet_tipo_criado", "wallet_id", "tipo", "criado_em"),
+        Index("ix_transactions_wallet_valor_id", "wallet_id", "valor", "id"),
+        Index("ix_transactions_criado_em", "criado_em"),  # /extrato filtra só por período
+        # Um lançamento por referência na carteira (ex.: "pix:{txid}"); referência vazia fica de fora
+        Index(
+            "uq_transactions_wallet_referencia",
+            "wallet_id",
+            "referencia",
+            unique=True,
+            postgresql_where=text("referencia <> ''"),
+            sqlite_where=text("referencia <> ''"),
+        ),
+    )
+
+# registra o listener que mantém os totais diários (wallet_daily_totals) no mesmo flush
+from app.models import wallet_daily_total  # noqa: E402,F401
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class WalletBalanceCheckpoint(Base):
+    """
+    Saldo do ledger da carteira no FIM do dia `dia` (UTC): soma de créditos menos
+    débitos de todos os lançamentos até 23:59:59.999999. Só dias já fechados e só
+    dias com movimento; gerado por ledger_service.checkpoint_balances.
+    """
+
+    __tablename__ = "wallet_balance_checkpoints"
+
+    wallet_id: Mapped[int] = mapped_column(
+        ForeignKey("wallets.id", ondelete="CASCADE"), primary_key=True
+    )
+    dia: Mapped[date] = mapped_column(Date, primary_key=True)
+    saldo: Mapped[float] = mapped_column(Numeric(16, 2), nullable=False)
+    qtd: Mapped[int] = mapped_column(Integer, nullable=False)  # lançamentos acumulados até o dia
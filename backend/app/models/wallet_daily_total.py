@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+from sqlalchemy import Date, ForeignKey, Integer, Numeric, event
+from sqlalchemy.orm import Mapped, Session, attributes, mapped_column
+from app.db.base import Base
+from app.models.wallet_version import bump_wallet_version
+
+
+class WalletDailyTotal(Base):
+    """
+    Totais por carteira/dia (UTC), mantidos no mesmo flush dos INSERT/UPDATE/DELETE
+    ORM em `transactions`. Escrita Core direta na tabela não passa pelo listener:
+    nesse caso `ledger_service.rebuild_daily_totals` recalcula.
+    """
+
+    __tablename__ = "wallet_daily_totals"
+
+    wallet_id: Mapped[int] = mapped_column(
+        ForeignKey("wallets.id", ondelete="CASCADE"), primary_key=True
+    )
+    dia: Mapped[date] = mapped_column(Date, primary_key=True)
+    credito: Mapped[float] = mapped_column(Numeric(14, 2), default=0, nullable=False)
+    debito: Mapped[float] = mapped_column(Numeric(14, 2), default=0, nullable=False)
+    qtd_credito: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    qtd_debito: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+def bucket_day(dt) -> date:
+    """Dia (UTC) do bucket de uma data de transação."""
+    if isinstance(dt, str):
+        dt = datetime.fromisoformat(dt.replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.date()
+
+
+def _upsert_stmt(bind, wallet_id: int, dia: date, credito, debito, qtd_c: int, qtd_d: int):
+    values = dict(
+        wallet_id=wallet_id,
+        dia=dia,
+        credito=credito,
+        debito=debito,
+        qtd_credito=qtd_c,
+        qtd_debito=qtd_d,
+    )
+    name = bind.dialect.name
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+
+    t = WalletDailyTotal.__table__
+    stmt = insert(t).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=[t.c.wallet_id, t.c.dia],
+        set_={
+            "credito": t.c.credito + stmt.excluded.credito,
+            "debito": t.c.debito + stmt.excluded.debito,
+            "qtd_credito": t.c.qtd_credito + stmt.excluded.qtd_credito,
+            "qtd_debito": t.c.qtd_debito + stmt.excluded.qtd_debito,
+        },
+    )
+
+
+def apply_daily_delta(conn, wallet_id: int, dia: date, credito=0, debito=0, qtd_c=0, qtd_d=0) -> None:
+    """Soma um delta no bucket (wallet, dia), criando se não existir (UPDATE atômico)."""
+    bump_wallet_version(conn, wallet_id)  # invalida o ETag do ledger da carteira
+
+    if dia < datetime.now(timezone.utc).date():
+        # lançamento retroativo: checkpoints de saldo a partir desse dia ficaram velhos
+        from app.models.wallet_balance_checkpoint import WalletBalanceCheckpoint as WBC
+
+        cp = WBC.__table__
+        conn.execute(cp.delete().where(cp.c.wallet_id == wallet_id, cp.c.dia >= dia))
+
+    stmt = _upsert_stmt(conn, wallet_id, dia, credito, debito, qtd_c, qtd_d)
+    if stmt is not None:
+        conn.execute(stmt)
+        return
+
+    # fallback genérico: UPDATE e, se não pegou linha, INSERT
+    t = WalletDailyTotal.__table__
+    res = conn.execute(
+        t.update()
+        .where(t.c.wallet_id == wallet_id, t.c.dia == dia)
+        .values(
+            credito=t.c.credito + credito,
+            debito=t.c.debito + debito,
+            qtd_credito=t.c.qtd_credito + qtd_c,
+            qtd_debito=t.c.qtd_debito + qtd_d,
+        )
+    )
+    if not res.rowcount:
+        conn.execute(
+            t.insert().values(
+                wallet_id=wallet_id,
+                dia=dia,
+                credito=credito,
+                debito=debito,
+                qtd_credito=qtd_c,
+                qtd_debito=qtd_d,
+            )
+        )
+
+
+_TRACKED_COLS = ("wallet_id", "criado_em", "tipo", "valor")  # colunas que mexem nos buckets
+
+
+@event.listens_for(Session, "before_flush")
+def _track_transactions(session: Session, flush_context, instances) -> None:
+    # import tardio: transaction.py importa este módulo pra registrar o listener
+    from app.models.transaction import Transaction
+
+    deltas: dict[tuple[int, date], list] = {}
+
+    def _acc(wallet_id, criado_em, tipo, valor, sign: int) -> None:
+        d = deltas.setdefault((wallet_id, bucket_day(criado_em)), [0, 0, 0, 0])
+        tipo = (tipo or "").upper()
+        if tipo == "CREDITO":
+            d[0] += sign * (valor or 0)
+            d[2] += sign
+        elif tipo == "DEBITO":
+            d[1] += sign * (valor or 0)
+            d[3] += sign
+
+    def _acc_tx(tx, sign: int) -> None:
+        if tx.criado_em is None:
+            # fixa o timestamp no Python pra saber o dia do bucket antes do INSERT
+            tx.criado_em = datetime.now(timezone.utc)
+        _acc(tx.wallet_id, tx.criado_em, tx.tipo, tx.valor, sign)
+
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            _acc_tx(obj, +1)
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            _acc_tx(obj, -1)
+    for obj in session.dirty:
+        # UPDATE de lançamento: tira os valores antigos do bucket antigo e soma os novos
+        if not isinstance(obj, Transaction) or not session.is_modified(obj):
+            continue
+        old, changed = {}, False
+        for col in _TRACKED_COLS:
+            hist = attributes.get_history(obj, col)
+            if hist.deleted:
+                old[col], changed = hist.deleted[0], True
+            else:
+                old[col] = getattr(obj, col)
+        if changed:
+            _acc(old["wallet_id"], old["criado_em"], old["tipo"], old["valor"], -1)
+            _acc_tx(obj, +1)
+
+    if not deltas:
+        return
+    from app.core.result_cache import mark_wallet_written
+
+    conn = session.connection()
+    for (wallet_id, dia), (cr, db_, qc, qd) in deltas.items():
+        apply_daily_delta(conn, wallet_id, dia, cr, db_, qc, qd)
+        mark_wallet_written(session, wallet_id)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class WalletVersion(Base):
+    """
+    Contador de versão do ledger da carteira: sobe a cada escrita em `transactions`
+    (mesma transação, via apply_daily_delta). Base do ETag das páginas do ledger.
+    """
+
+    __tablename__ = "wallet_versions"
+
+    wallet_id: Mapped[int] = mapped_column(
+        ForeignKey("wallets.id", ondelete="CASCADE"), primary_key=True
+    )
+    versao: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    atualizado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+def bump_wallet_version(conn, wallet_id: int) -> None:
+    """versao += 1 (cria a linha na primeira escrita da carteira)."""
+    t = WalletVersion.__table__
+    agora = datetime.now(timezone.utc)
+    name = conn.dialect.name
+    if name in ("postgresql", "sqlite"):
+        if name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(t).values(wallet_id=wallet_id, versao=1, atualizado_em=agora)
+        conn.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[t.c.wallet_id],
+                set_={"versao": t.c.versao + 1, "atualizado_em": stmt.excluded.atualizado_em},
+            )
+        )
+        return
+
+    # fallback genérico: UPDATE e, se não pegou linha, INSERT
+    res = conn.execute(
+        t.update().where(t.c.wallet_id == wallet_id).values(versao=t.c.versao + 1, atualizado_em=agora)
+    )
+    if not res.rowcount:
+        conn.execute(t.insert().values(wallet_id=wallet_id, versao=1, atualizado_em=agora))
@@ -0,0 +1,27 @@
+from sqlalchemy import Index, Integer, String, Text, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+class WebhookInbox(Base):
+    """
+    Entrega de webhook aceita e ainda não (ou já) aplicada.
+    PENDING -> PROCESSING (lote reservado por um worker) -> DONE | ERROR.
+    """
+    __tablename__ = "webhook_inbox"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    origem: Mapped[str] = mapped_column(String(32), nullable=False, default="psp_pix")
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="PENDING")
+    tentativas: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    lote: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    resultado: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # Preenchidos no Python (UTC), não por server_default: o lag compara datas
+    recebido_em: Mapped[str] = mapped_column(DateTime(timezone=True), nullable=False)
+    reservado_em: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    processado_em: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # fila: WHERE status = 'PENDING' ORDER BY id
+        Index("ix_webhook_inbox_status_id", "status", "id"),
+    )
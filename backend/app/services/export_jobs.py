@@ -0,0 +1,226 @@
+# app/services/export_jobs.py
+"""
+Jobs de export do ledger: um pool de threads gera o arquivo (CSV, Parquet ou
+Arrow) num diretório local, fora do request; o cliente consulta o status e baixa
+com Range (retomável). Job idêntico (mesma wallet + filtros + formato) dentro
+do TTL reaproveita o job/arquivo existente, desde que o ledger da carteira não
+tenha mudado (a versão da carteira entra na chave).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.export_job import ExportJob
+from app.services.ledger_service import ledger_version
+
+FORMATS = ("csv", "parquet", "arrow")
+FINISHED = ("DONE", "ERROR")  # status que o purge pode apagar
+EXTENSIONS = {"csv": "csv", "parquet": "parquet", "arrow": "arrows"}
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt  # SQLite devolve naive
+
+
+def job_key(wallet_id: int, formato: str, params: dict, versao: int = 0) -> str:
+    """Chave de dedup: lançamento novo na carteira (versão) = export novo."""
+    raw = json.dumps([wallet_id, versao, formato, params], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _render(job: ExportJob, path: str) -> None:
+    # import tardio: reaproveita os selects/formatação das rotas (como o index_advisor)
+    from app.api.v1.routes.ledger import (
+        CSV_HEADER, DATE_COL, ORDER_MAP, _csv_row_formatter, _iter_csv, _ledger_rows_stmt, _parse_dt,
+    )
+    from app.services import ledger_export
+
+    p = json.loads(job.params)
+    ds, de = _parse_dt(p.get("start"), False), _parse_dt(p.get("end"), True)
+    col = ORDER_MAP.get(p.get("order_by") or "data", DATE_COL)
+    stmt = _ledger_rows_stmt(job.wallet_id, p.get("tipo"), ds, de, col, p.get("order_dir") or "desc")
+
+    if job.formato == "csv":
+        sep = "," if p.get("csv_sep") == "," else ";"
+        use_comma = (p.get("csv_decimal") or "comma").lower() != "dot"
+        chunks = _iter_csv(stmt, CSV_HEADER, _csv_row_formatter(use_comma), sep)
+    else:
+        if ledger_export.pa is None:
+            raise RuntimeError("pyarrow não instalado")
+        chunks = ledger_export.iter_columnar(SessionLocal, stmt, job.formato)
+
+    with open(path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+class ExportJobs:
+    def __init__(
+        self,
+        workers: int = settings.EXPORT_WORKERS,
+        directory: str = settings.EXPORT_DIR,
+        ttl_s: int = settings.EXPORT_JOB_TTL_SECONDS,
+    ):
+        self.workers = workers
+        self.directory = directory
+        self.ttl_s = ttl_s
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.reused = 0
+        self.created = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="export")
+            return self._executor
+
+    def create(self, db: Session, wallet_id: int, formato: str, params: dict) -> tuple[ExportJob, bool]:
+        """Cria o job (ou devolve o idêntico ainda válido). Retorna (job, reaproveitado)."""
+        self.purge_expired(db)
+        now = _utcnow()
+        versao, _ = ledger_version(db, wallet_id)
+        chave = job_key(wallet_id, formato, params, versao)
+        existing = db.execute(
+            select(ExportJob)
+            .where(ExportJob.chave == chave, ExportJob.expira_em > now, ExportJob.status != "ERROR")
+            .order_by(ExportJob.criado_em.desc())
+            .limit(1)
+        ).scalars().first()
+        if existing is not None:
+            self.reused += 1
+            return existing, True
+
+        job = ExportJob(
+            id=uuid.uuid4().hex,
+            chave=chave,
+            wallet_id=wallet_id,
+            formato=formato,
+            params=json.dumps(params, sort_keys=True),
+            status="PENDING",
+            criado_em=now,
+            expira_em=now + timedelta(seconds=self.ttl_s),
+        )
+        db.add(job)
+        db.commit()
+        self.created += 1
+        self._pool().submit(self._run, job.id)
+        return job, False
+
+    def _run(self, job_id: str) -> None:
+        with SessionLocal() as db:
+            # reserva (compare-and-set): só um worker/processo gera cada job
+            res = db.execute(
+                update(ExportJob)
+                .where(ExportJob.id == job_id, ExportJob.status == "PENDING")
+                .values(status="RUNNING")
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            if not res.rowcount:
+                return
+            job = db.get(ExportJob, job_id)
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{job.id}.{EXTENSIONS[job.formato]}")
+            tmp = path + ".part"
+            try:
+                _render(job, tmp)
+                os.replace(tmp, path)  # arquivo final só aparece completo
+            except Exception as e:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                job.status, job.erro = "ERROR", str(e)[:255]
+                db.commit()
+                print(f"[EXPORT] job {job_id} falhou:", e)
+                return
+            now = _utcnow()
+            job.status, job.arquivo, job.tamanho = "DONE", path, os.path.getsize(path)
+            job.concluido_em, job.expira_em = now, now + timedelta(seconds=self.ttl_s)
+            db.commit()
+
+    def resume(self) -> int:
+        """No startup: reenfileira jobs que ficaram PENDING/RUNNING (processo caiu no meio)."""
+        with SessionLocal() as db:
+            db.execute(
+                update(ExportJob)
+                .where(ExportJob.status == "RUNNING")
+                .values(status="PENDING")
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            # todos os PENDING, mesmo vencidos: o purge não apaga job não terminado
+            ids = db.execute(select(ExportJob.id).where(ExportJob.status == "PENDING")).scalars().all()
+        for job_id in ids:
+            self._pool().submit(self._run, job_id)
+        return len(ids)
+
+    def purge_expired(self, db: Session) -> int:
+        """
+        Apaga jobs vencidos e os arquivos deles. Só os terminados (DONE/ERROR): job
+        PENDING/RUNNING velho (export grande, retomado no startup) ainda tem worker
+        escrevendo ou pra escrever; ganha expira_em novo quando termina.
+        """
+        expired = db.execute(
+            select(ExportJob.id, ExportJob.arquivo).where(
+                ExportJob.expira_em <= _utcnow(), ExportJob.status.in_(FINISHED)
+            )
+        ).all()
+        for _, arquivo in expired:
+            if arquivo and os.path.exists(arquivo):
+                try:
+                    os.remove(arquivo)
+                except OSError:
+                    pass
+        if expired:
+            db.execute(
+                ExportJob.__table__.delete().where(
+                    ExportJob.__table__.c.id.in_([j for j, _ in expired]),
+                    ExportJob.__table__.c.status.in_(FINISHED),
+                )
+            )
+            db.commit()
+        return len(expired)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def describe(self, job: ExportJob) -> dict:
+        return {
+            "id": job.id,
+            "status": job.status,
+            "wallet_id": job.wallet_id,
+            "formato": job.formato,
+            "params": json.loads(job.params),
+            "tamanho": job.tamanho,
+            "erro": job.erro,
+            "criado_em": _aware(job.criado_em).isoformat(),
+            "concluido_em": _aware(job.concluido_em).isoformat() if job.concluido_em else None,
+            "expira_em": _aware(job.expira_em).isoformat(),
+            "download_url": f"/api/v1/exports/{job.id}/download" if job.status == "DONE" else None,
+        }
+
+
+export_jobs = ExportJobs()
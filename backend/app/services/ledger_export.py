@@ -0,0 +1,141 @@
+# app/services/ledger_export.py
+"""
+Export colunar do ledger (Parquet ou Arrow IPC stream), gerado em lotes direto do
+cursor do banco: cada lote de `COLUMNAR_BATCH_ROWS` linhas vira um row group
+(Parquet) ou um record batch (Arrow) e sai na hora, sem montar o arquivo inteiro
+em memória.
+
+Colunas tipadas: id int64, data timestamp[us, UTC], tipo dictionary<string>,
+valor decimal128(12, 2), descricao string.
+
+pyarrow é opcional: sem ele `pa is None` e as rotas respondem 501.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # dependência opcional
+    pa = pq = None
+
+COLUMNAR_BATCH_ROWS = 65_536  # linhas por row group / record batch
+PARQUET_COMPRESSION = "zstd"
+ARROW_COMPRESSION = "zstd"  # buffers do IPC (pyarrow >= 0.17 lê direto)
+
+FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+
+def schema():
+    return pa.schema(
+        [
+            pa.field("id", pa.int64(), nullable=False),
+            pa.field("data", pa.timestamp("us", tz="UTC")),
+            pa.field("tipo", pa.dictionary(pa.int8(), pa.string())),
+            pa.field("valor", pa.decimal128(12, 2)),
+            pa.field("descricao", pa.string()),
+        ]
+    )
+
+
+def _utc(v):
+    if v is None:
+        return None
+    if isinstance(v, str):
+        v = datetime.fromisoformat(v.replace("Z", "+00:00"))
+    return v.replace(tzinfo=timezone.utc) if v.tzinfo is None else v.astimezone(timezone.utc)
+
+
+def _valor(v):
+    if v is None:
+        return None
+    return (v if isinstance(v, Decimal) else Decimal(str(v))).quantize(Decimal("0.01"))
+
+
+def _typed(values, typ, convert):
+    """Conversão em bloco pelo pyarrow; item a item só se o driver devolveu outro tipo (str/float)."""
+    try:
+        return pa.array(values, typ)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        return pa.array([convert(v) for v in values], typ)
+
+
+def _record_batch(rows, sch):
+    ids, datas, tipos, valores, descs = zip(*rows)
+    return pa.record_batch(
+        [
+            pa.array(ids, pa.int64()),
+            # naive = UTC (SQLite); aware é normalizado pra UTC pelo pyarrow
+            _typed(datas, pa.timestamp("us"), _utc).cast(sch.field("data").type),
+            pa.array(tipos, pa.string()).dictionary_encode().cast(sch.field("tipo").type),
+            _typed(valores, sch.field("valor").type, _valor),
+            pa.array(descs, pa.string()),
+        ],
+        schema=sch,
+    )
+
+
+class _ChunkSink:
+    """Arquivo só-escrita que acumula bytes até o gerador drenar (pra streaming)."""
+
+    closed = False
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._pos = 0
+
+    def write(self, b) -> int:
+        b = bytes(b)
+        self._parts.append(b)
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+def iter_columnar(session_factory, stmt, fmt: str, batch_rows: int = COLUMNAR_BATCH_ROWS):
+    """
+    Gera o arquivo em chunks de bytes. Abre a própria sessão (como o CSV): a do
+    Depends fecha antes do corpo ser enviado.
+    """
+    sch = schema()
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, sch, compression=PARQUET_COMPRESSION)
+        write = lambda rb: writer.write_batch(rb, row_group_size=batch_rows)  # noqa: E731
+    else:
+        writer = pa.ipc.new_stream(sink, sch, options=pa.ipc.IpcWriteOptions(compression=ARROW_COMPRESSION))
+        write = writer.write_batch
+
+    db = session_factory()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=batch_rows))
+        for rows in result.partitions():
+            write(_record_batch(rows, sch))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        writer.close()
+        tail = sink.drain()  # footer (Parquet) / fim do stream (Arrow)
+        if tail:
+            yield tail
+    finally:
+        db.close()
+
@@ -0,0 +1,366 @@
+# app/services/ledger_service.py
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import and_, case, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.result_cache import mark_wallet_written
+from app.models.transaction import Transaction as TM
+from app.models.wallet import Wallet
+from app.models.wallet_balance_checkpoint import WalletBalanceCheckpoint as WBC
+from app.models.wallet_daily_total import WalletDailyTotal as WDT, apply_daily_delta, bucket_day
+from app.models.wallet_version import WalletVersion
+from app.schemas.ledger import PostLedgerEntry
+
+
+def _naive_utc(dt):
+    if isinstance(dt, datetime) and dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _scan_totals(db: Session, wallet_id: int, tipo: str | None, *conds):
+    """Totais varrendo `transactions` (usado só nas bordas parciais do período)."""
+    q = db.query(
+        func.count(TM.id),
+        func.coalesce(func.sum(case((TM.tipo == "CREDITO", TM.valor), else_=0)), 0),
+        func.coalesce(func.sum(case((TM.tipo == "DEBITO", TM.valor), else_=0)), 0),
+    ).filter(TM.wallet_id == wallet_id, *conds)
+    if tipo:
+        q = q.filter(TM.tipo == tipo)
+    n, cr, de = q.one()
+    return int(n or 0), float(cr or 0), float(de or 0)
+
+
+def range_totals(
+    db: Session, wallet_id: int, ds=None, de=None, tipo: str | None = None
+) -> tuple[int, float, float]:
+    """
+    (qtd, credito, debito) da carteira no período [ds, de].
+
+    Dias inteiros saem de `wallet_daily_totals`; só os dias de borda parciais
+    (quando ds/de não caem na virada do dia) varrem `transactions`.
+    """
+    ds, de = _naive_utc(ds), _naive_utc(de)
+    if isinstance(ds, str) or isinstance(de, str):
+        # data que não parseou: mantém o comportamento antigo (comparação direta)
+        conds = []
+        if ds is not None:
+            conds.append(TM.criado_em >= ds)
+        if de is not None:
+            conds.append(TM.criado_em <= de)
+        return _scan_totals(db, wallet_id, tipo, *conds)
+
+    full_from: date | None = None
+    full_to: date | None = None
+    if ds is not None:
+        full_from = ds.date() if ds.time() == time.min else ds.date() + timedelta(days=1)
+    if de is not None:
+        full_to = de.date() if de.time() == time.max else de.date() - timedelta(days=1)
+
+    if full_from is not None and full_to is not None and full_from > full_to:
+        # período menor que um dia: varre direto (já é limitado)
+        return _scan_totals(db, wallet_id, tipo, TM.criado_em >= ds, TM.criado_em <= de)
+
+    bq = db.query(
+        func.coalesce(func.sum(WDT.credito), 0),
+        func.coalesce(func.sum(WDT.debito), 0),
+        func.coalesce(func.sum(WDT.qtd_credito), 0),
+        func.coalesce(func.sum(WDT.qtd_debito), 0),
+    ).filter(WDT.wallet_id == wallet_id)
+    if full_from is not None:
+        bq = bq.filter(WDT.dia >= full_from)
+    if full_to is not None:
+        bq = bq.filter(WDT.dia <= full_to)
+    cr, dbt, qc, qd = bq.one()
+    credito, debito = float(cr or 0), float(dbt or 0)
+    qtd_c, qtd_d = int(qc or 0), int(qd or 0)
+    if tipo == "CREDITO":
+        debito, qtd_d = 0.0, 0
+    elif tipo == "DEBITO":
+        credito, qtd_c = 0.0, 0
+    total = qtd_c + qtd_d
+
+    # Bordas comparadas com "fim do dia anterior" (<= / >) em vez de "meia-noite" (< / >=):
+    # no SQLite a data é texto e '... 00:00:00' < '... 00:00:00.000000'.
+    if ds is not None and ds.time() != time.min:
+        edge_end = datetime.combine(full_from - timedelta(days=1), time.max)
+        n, c, d = _scan_totals(db, wallet_id, tipo, TM.criado_em >= ds, TM.criado_em <= edge_end)
+        total, credito, debito = total + n, credito + c, debito + d
+    if de is not None and de.time() != time.max:
+        edge_start = datetime.combine(full_to, time.max)
+        n, c, d = _scan_totals(db, wallet_id, tipo, TM.criado_em > edge_start, TM.criado_em <= de)
+        total, credito, debito = total + n, credito + c, debito + d
+
+    return total, credito, debito
+
+
+def rebuild_daily_totals(db: Session, wallet_id: int | None = None) -> int:
+    """Recalcula `wallet_daily_totals` a partir de `transactions`. Retorna nº de buckets."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        day = func.date(func.timezone("UTC", TM.criado_em))
+    else:
+        day = func.date(TM.criado_em)
+
+    q = db.query(
+        TM.wallet_id,
+        day.label("dia"),
+        func.coalesce(func.sum(case((TM.tipo == "CREDITO", TM.valor), else_=0)), 0),
+        func.coalesce(func.sum(case((TM.tipo == "DEBITO", TM.valor), else_=0)), 0),
+        func.sum(case((TM.tipo == "CREDITO", 1), else_=0)),
+        func.sum(case((TM.tipo == "DEBITO", 1), else_=0)),
+    ).group_by(TM.wallet_id, day)
+
+    dq = db.query(WDT)
+    cq = db.query(WBC)  # checkpoints saem dos buckets: refaz junto
+    if wallet_id is not None:
+        q = q.filter(TM.wallet_id == wallet_id)
+        dq = dq.filter(WDT.wallet_id == wallet_id)
+        cq = cq.filter(WBC.wallet_id == wallet_id)
+    dq.delete(synchronize_session=False)
+    cq.delete(synchronize_session=False)
+
+    rows = [
+        {
+            "wallet_id": w,
+            "dia": d if isinstance(d, date) else bucket_day(str(d)),
+            "credito": cr,
+            "debito": de,
+            "qtd_credito": int(qc or 0),
+            "qtd_debito": int(qd or 0),
+        }
+        for w, d, cr, de, qc, qd in q
+    ]
+    if rows:
+        db.execute(WDT.__table__.insert(), rows)
+    db.commit()
+    return len(rows)
+
+
+# ========= Saldo em T (checkpoints) =========
+# Dias fechados há menos que isso não ganham checkpoint: uma escrita no fim do dia D
+# faz flush com D ainda "hoje" (apply_daily_delta não apaga checkpoint) e pode
+# commitar depois do job ler o bucket de D. Com a folga, D já não está em disputa.
+CHECKPOINT_LAG_DAYS = 2  # último dia com checkpoint = anteontem (UTC)
+
+
+def checkpoint_balances(db: Session, wallet_id: int | None = None, until: date | None = None) -> int:
+    """
+    Grava os checkpoints de fim de dia que faltam, até `until` (limitado a
+    CHECKPOINT_LAG_DAYS atrás, UTC), continuando do último checkpoint de cada
+    carteira e somando os buckets diários. Retorna nº de checkpoints gravados.
+    """
+    safe = datetime.now(timezone.utc).date() - timedelta(days=CHECKPOINT_LAG_DAYS)
+    until = min(until, safe) if until else safe
+
+    last = select(WBC.wallet_id, func.max(WBC.dia).label("dia")).group_by(WBC.wallet_id)
+    if wallet_id is not None:
+        last = last.where(WBC.wallet_id == wallet_id)
+    last = last.subquery()
+
+    base = {
+        w: (Decimal(saldo), qtd)
+        for w, saldo, qtd in db.execute(
+            select(WBC.wallet_id, WBC.saldo, WBC.qtd).join(
+                last, and_(WBC.wallet_id == last.c.wallet_id, WBC.dia == last.c.dia)
+            )
+        )
+    }
+
+    q = (
+        select(WDT.wallet_id, WDT.dia, WDT.credito, WDT.debito, WDT.qtd_credito, WDT.qtd_debito)
+        .outerjoin(last, last.c.wallet_id == WDT.wallet_id)
+        .where(WDT.dia <= until, or_(last.c.dia.is_(None), WDT.dia > last.c.dia))
+        .order_by(WDT.wallet_id, WDT.dia)
+    )
+    if wallet_id is not None:
+        q = q.where(WDT.wallet_id == wallet_id)
+
+    rows = []
+    for w, d, cr, dbt, qc, qd in db.execute(q):
+        saldo, qtd = base.get(w, (Decimal("0"), 0))
+        saldo, qtd = saldo + Decimal(cr or 0) - Decimal(dbt or 0), qtd + int(qc or 0) + int(qd or 0)
+        base[w] = (saldo, qtd)
+        rows.append({"wallet_id": w, "dia": d, "saldo": saldo, "qtd": qtd})
+    if not rows:
+        return 0
+    try:
+        db.execute(WBC.__table__.insert(), rows)
+        db.commit()
+    except IntegrityError:
+        # outra rodada gravou os mesmos dias antes: fica a dela
+        db.rollback()
+        return 0
+    return len(rows)
+
+
+def balance_as_of(db: Session, wallet_id: int, t=None) -> float:
+    """
+    Saldo do ledger (créditos - débitos) no instante `t` (None = agora): o último
+    checkpoint fechado até `t` + buckets dos dias inteiros seguintes + borda parcial.
+    """
+    t = _naive_utc(t)
+    if isinstance(t, str):
+        # data que não parseou: soma direta, como em range_totals
+        _, cr, dbt = _scan_totals(db, wallet_id, None, TM.criado_em <= t)
+        return cr - dbt
+
+    q = select(WBC.dia, WBC.saldo).where(WBC.wallet_id == wallet_id)
+    if t is not None:
+        # checkpoint de `dia` vale pro fim do dia: só serve se o dia terminou até t
+        q = q.where(WBC.dia <= (t.date() if t.time() == time.max else t.date() - timedelta(days=1)))
+    cp = db.execute(q.order_by(WBC.dia.desc()).limit(1)).first()
+
+    ds, saldo = None, 0.0
+    if cp is not None:
+        ds, saldo = datetime.combine(cp.dia + timedelta(days=1), time.min), float(cp.saldo)
+        if t is not None and ds > t:
+            return saldo
+    _, cr, dbt = range_totals(db, wallet_id, ds, t)
+    return saldo + cr - dbt
+
+
+def ledger_version(db: Session, wallet_id: int) -> tuple[int, datetime | None]:
+    """(versão, última escrita) do ledger da carteira: uma leitura por PK."""
+    row = db.execute(
+        select(WalletVersion.versao, WalletVersion.atualizado_em).where(WalletVersion.wallet_id == wallet_id)
+    ).first()
+    return (row.versao, row.atualizado_em) if row else (0, None)
+
+
+def wallets_version(db: Session) -> tuple[tuple, datetime | None]:
+    """
+    Marcador da lista de carteiras: (qtd, maior id, soma das versões) + última escrita
+    (lançamento ou carteira criada, o que for mais recente).
+    """
+    qtd, max_id, criada = db.execute(
+        select(func.count(Wallet.id), func.max(Wallet.id), func.max(Wallet.criado_em))
+    ).one()
+    soma, ultima = db.execute(
+        select(func.coalesce(func.sum(WalletVersion.versao), 0), func.max(WalletVersion.atualizado_em))
+    ).one()
+    datas = [_naive_utc(d) for d in (criada, ultima) if isinstance(d, datetime)]
+    return (qtd, max_id, soma), max(datas) if datas else None
+
+
+async def checkpoint_loop(every_s: float, stop: asyncio.Event) -> None:
+    """Roda checkpoint_balances a cada `every_s` segundos (em thread, sessão própria)."""
+    from app.db.session import SessionLocal
+
+    def _run() -> int:
+        with SessionLocal() as db:
+            return checkpoint_balances(db)
+
+    while not stop.is_set():
+        try:
+            n = await asyncio.to_thread(_run)
+            if n:
+                print(f"[LEDGER] {n} checkpoints de saldo gravados")
+        except Exception as e:
+            print("[LEDGER] checkpoints falharam:", e)
+        try:
+            await asyncio.wait_for(stop.wait(), every_s)
+        except asyncio.TimeoutError:
+            pass
+
+
+# ========= Lançamento em lote =========
+VALOR_MAX = Decimal("9999999999.99")  # Numeric(12, 2)
+REF_MAX = 255
+IN_CHUNK = 1000
+
+
+class LedgerPostError(Exception):
+    """Lote recusado na validação; `status_code`/`detail` vão direto pro HTTPException."""
+
+    def __init__(self, status_code: int, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _validate_entries(entries: list[PostLedgerEntry]) -> list[dict]:
+    erros = []
+    seen: dict[str, int] = {}
+    for i, e in enumerate(entries):
+        if not e.valor.is_finite() or e.valor <= 0:
+            erros.append({"index": i, "erro": "valor deve ser positivo"})
+        elif e.valor > VALOR_MAX or e.valor.as_tuple().exponent < -2:
+            erros.append({"index": i, "erro": "valor fora de Numeric(12, 2)"})
+        if len(e.referencia) > REF_MAX:
+            erros.append({"index": i, "erro": f"referencia com mais de {REF_MAX} caracteres"})
+        elif e.referencia:
+            if e.referencia in seen:
+                erros.append({"index": i, "erro": f"referencia repetida no lote (item {seen[e.referencia]})"})
+            else:
+                seen[e.referencia] = i
+    return erros
+
+
+def post_ledger_entries(db: Session, wallet_id: int, entries: list[PostLedgerEntry]) -> dict:
+    """
+    Grava um lote de lançamentos da carteira numa transação só.
+
+    Valida tudo antes de escrever (carteira, valores, referências repetidas no lote
+    ou já gravadas); depois um INSERT em lote (executemany), um UPDATE do saldo e um
+    upsert por dia em `wallet_daily_totals` (o insert Core não passa pelo before_flush).
+    """
+    if not entries:
+        raise LedgerPostError(422, "lote vazio")
+    if db.execute(select(Wallet.id).where(Wallet.id == wallet_id)).first() is None:
+        raise LedgerPostError(404, "Carteira não encontrada")
+
+    erros = _validate_entries(entries)
+    if erros:
+        raise LedgerPostError(422, erros)
+
+    refs = [e.referencia for e in entries if e.referencia]
+    existentes = []
+    for lo in range(0, len(refs), IN_CHUNK):
+        existentes += db.execute(
+            select(TM.referencia).where(TM.wallet_id == wallet_id, TM.referencia.in_(refs[lo:lo + IN_CHUNK]))
+        ).scalars().all()
+    if existentes:
+        raise LedgerPostError(409, {"erro": "referencias já lançadas", "referencias": sorted(existentes)})
+
+    agora = datetime.now(timezone.utc)
+    credito = sum((e.valor for e in entries if e.tipo == "CREDITO"), Decimal("0"))
+    debito = sum((e.valor for e in entries if e.tipo == "DEBITO"), Decimal("0"))
+    qtd_c = sum(1 for e in entries if e.tipo == "CREDITO")
+
+    try:
+        db.execute(
+            insert(TM.__table__),
+            [
+                {"wallet_id": wallet_id, "tipo": e.tipo, "valor": e.valor, "referencia": e.referencia, "criado_em": agora}
+                for e in entries
+            ],
+        )
+        db.execute(
+            update(Wallet)
+            .where(Wallet.id == wallet_id)
+            .values(saldo_atual=Wallet.saldo_atual + (credito - debito))
+            .execution_options(synchronize_session=False)
+        )
+        apply_daily_delta(db.connection(), wallet_id, bucket_day(agora), credito, debito, qtd_c, len(entries) - qtd_c)
+        mark_wallet_written(db, wallet_id)  # insert Core não passa pelo listener do flush
+        db.commit()
+    except IntegrityError:
+        # outra escrita gravou uma das referências entre a checagem e o insert
+        db.rollback()
+        raise LedgerPostError(409, "referencia já lançada (concorrência)")
+
+    saldo = db.execute(select(Wallet.saldo_atual).where(Wallet.id == wallet_id)).scalar()
+    return {
+        "wallet_id": wallet_id,
+        "inseridos": len(entries),
+        "credito": float(credito),
+        "debito": float(debito),
+        "saldo_atual": float(saldo or 0),
+    }
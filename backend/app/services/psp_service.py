@@ -0,0 +1,436 @@
+# app/services/psp_service.py
+"""
+Confirmações PIX do PSP: aplicação unitária/em lote e o worker do inbox.
+
+As rotas em app/api/v1/webhooks/psp_pix.py usam `apply_one`/`apply_batch`.
+Com WEBHOOK_ASYNC_MODE=1 a rota só grava o payload em `webhook_inbox` e
+responde 204; `InboxWorkers` drena a fila em lotes com `apply_batch`.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import and_, bindparam, func, or_, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.pix_invoice import PixInvoice
+from app.models.transaction import Transaction
+from app.models.wallet import Wallet
+from app.models.webhook_inbox import WebhookInbox
+from app.utils.idempotency import idempotency
+
+CONFIRMED_STATUSES = ("CONFIRMED", "PAID", "COMPLETED")
+BATCH_IN_CHUNK = 1000  # tamanho dos IN (...) nas cargas em lote
+
+
+def parse_item(payload) -> tuple[str, Decimal, str]:
+    txid = payload["txid"]
+    if not isinstance(txid, str) or not txid:
+        raise ValueError("txid")
+    valor = Decimal(str(payload["valor"]))
+    # crédito PIX: positivo, finito e em centavos (negativo/NaN viraria débito ou quebraria o saldo)
+    if not valor.is_finite() or valor <= 0 or valor.as_tuple().exponent < -2:
+        raise ValueError("valor")
+    return txid, valor, payload.get("status", "CONFIRMED")
+
+async def apply_one(db: AsyncSession, txid: str, valor: Decimal, status_psp: str) -> str:
+    """Aplica uma confirmação e commita. Retorna credited | duplicate | not_found | not_confirmed | wallet_not_found."""
+    ref = f"pix:{txid}"
+
+    # Idempotência: cache em memória / tabela de chaves, sem tocar wallet nem transactions
+    if await idempotency.seen(db, ref):
+        return "duplicate"
+
+    inv = (await db.execute(select(PixInvoice).where(PixInvoice.txid == txid))).scalars().first()
+    if not inv:
+        return "not_found"
+
+    if inv.status == "CONFIRMED":
+        idempotency.mark(ref)
+        return "duplicate"
+
+    if status_psp not in CONFIRMED_STATUSES:
+        return "not_confirmed"
+
+    wallet_id = (await _user_wallets(db, [inv.user_id])).get(inv.user_id)
+    if wallet_id is None:
+        return "wallet_not_found"
+
+    # Confirma a cobrança só se ainda não estava confirmada (compare-and-set);
+    # no Postgres o UPDATE trava a linha e serializa entregas do mesmo txid.
+    res = await db.execute(
+        update(PixInvoice)
+        .where(PixInvoice.id == inv.id, PixInvoice.status != "CONFIRMED")
+        .values(status="CONFIRMED")
+        .execution_options(synchronize_session=False)
+    )
+    if res.rowcount == 0:
+        await db.rollback()
+        idempotency.mark(ref)
+        return "duplicate"
+
+    # Crédito atômico no banco (sem read-modify-write no Python): callbacks
+    # concorrentes da mesma carteira não perdem atualização.
+    await db.execute(
+        update(Wallet)
+        .where(Wallet.id == wallet_id)
+        .values(saldo_atual=Wallet.saldo_atual + valor)
+        .execution_options(synchronize_session=False)
+    )
+    db.add(Transaction(wallet_id=wallet_id, tipo="CREDITO", valor=valor, referencia=ref))
+    idempotency.add(db, ref)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # entrega concorrente com o mesmo txid já gravou a chave/referência
+        await db.rollback()
+        idempotency.mark(ref)
+        return "duplicate"
+    idempotency.mark(ref)
+    if idempotency.should_purge():
+        await db.execute(idempotency.purge_stmt())
+        await db.commit()
+    return "credited"
+
+def _chunks(seq, n: int = BATCH_IN_CHUNK):
+    seq = list(seq)
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+async def _user_wallets(db: AsyncSession, user_ids) -> dict[int, int]:
+    """user_id -> carteira creditada (a de menor id, se houver mais de uma); unitário e lote usam a mesma."""
+    wallets: dict[int, int] = {}
+    for chunk in _chunks(user_ids):
+        rows = await db.execute(
+            select(Wallet.user_id, Wallet.id).where(Wallet.user_id.in_(chunk)).order_by(Wallet.id.desc())
+        )
+        wallets.update(rows.all())
+    return wallets
+
+async def apply_batch(db: AsyncSession, items: list) -> list[dict]:
+    """
+    Aplica confirmações em lote: cargas em bulk (chaves de idempotência,
+    cobranças, carteiras) e um único commit. Retorna {"txid", "result"} por item,
+    na ordem recebida ("error" = falha de banco no item; pode ser reenviado).
+    """
+    results: list[dict] = [None] * len(items)
+    parsed: dict[str, tuple[int, Decimal, str]] = {}  # txid -> (posição, valor, status)
+    for i, it in enumerate(items):
+        try:
+            txid, valor, status_psp = parse_item(it)
+        except Exception:
+            results[i] = {"txid": it.get("txid") if isinstance(it, dict) else None, "result": "invalid"}
+            continue
+        if txid in parsed:
+            results[i] = {"txid": txid, "result": "duplicate"}
+            continue
+        parsed[txid] = (i, valor, status_psp)
+
+    def put(txid: str, result: str) -> None:
+        results[parsed[txid][0]] = {"txid": txid, "result": result}
+
+    # já processados (cache + 1 query por bloco)
+    done = set()
+    for chunk in _chunks(parsed):
+        done |= {r[len("pix:"):] for r in await idempotency.seen_many(db, [f"pix:{t}" for t in chunk])}
+    for t in done:
+        put(t, "duplicate")
+
+    # cobranças e carteiras em bulk
+    invoices: dict[str, PixInvoice] = {}
+    for chunk in _chunks(t for t in parsed if t not in done):
+        rows = (await db.execute(select(PixInvoice).where(PixInvoice.txid.in_(chunk)))).scalars()
+        invoices.update((inv.txid, inv) for inv in rows)
+
+    wallets = await _user_wallets(db, {inv.user_id for inv in invoices.values()})
+
+    to_credit: list[tuple[str, PixInvoice, int]] = []
+    for txid, (_, _, status_psp) in parsed.items():
+        if txid in done:
+            continue
+        inv = invoices.get(txid)
+        if inv is None:
+            put(txid, "not_found")
+        elif inv.status == "CONFIRMED":
+            idempotency.mark(f"pix:{txid}")
+            put(txid, "duplicate")
+        elif status_psp not in CONFIRMED_STATUSES:
+            put(txid, "not_confirmed")
+        elif inv.user_id not in wallets:
+            put(txid, "wallet_not_found")
+        else:
+            to_credit.append((txid, inv, wallets[inv.user_id]))
+
+    if to_credit:
+        per_wallet: dict[int, Decimal] = {}
+        for txid, _, wid in to_credit:
+            per_wallet[wid] = per_wallet.get(wid, Decimal("0")) + parsed[txid][1]
+
+        applied = False
+        try:
+            confirmed = 0
+            for chunk in _chunks([inv.id for _, inv, _ in to_credit]):
+                res = await db.execute(
+                    update(PixInvoice)
+                    .where(PixInvoice.id.in_(chunk), PixInvoice.status != "CONFIRMED")
+                    .values(status="CONFIRMED")
+                    .execution_options(synchronize_session=False)
+                )
+                confirmed += res.rowcount
+            if confirmed == len(to_credit):
+                # um UPDATE atômico por carteira (executemany), não por item
+                t = Wallet.__table__
+                await db.execute(
+                    t.update()
+                    .where(t.c.id == bindparam("wid"))
+                    .values(saldo_atual=t.c.saldo_atual + bindparam("credito")),
+                    [{"wid": wid, "credito": v} for wid, v in per_wallet.items()],
+                )
+                db.add_all(
+                    Transaction(wallet_id=wid, tipo="CREDITO", valor=parsed[txid][1], referencia=f"pix:{txid}")
+                    for txid, _, wid in to_credit
+                )
+                for txid, _, _ in to_credit:
+                    idempotency.add(db, f"pix:{txid}")
+                await db.commit()
+                applied = True
+        except IntegrityError:
+            pass
+        if applied:
+            idempotency.mark(*(f"pix:{txid}" for txid, _, _ in to_credit))
+            for txid, _, _ in to_credit:
+                put(txid, "credited")
+        else:
+            # corrida com outra entrega no meio do lote: refaz item a item
+            await db.rollback()
+            for txid, _, _ in to_credit:
+                _, valor, status_psp = parsed[txid]
+                try:
+                    put(txid, await apply_one(db, txid, valor, status_psp))
+                except SQLAlchemyError:
+                    # erro de banco num item não derruba o resto do lote
+                    await db.rollback()
+                    put(txid, "error")
+
+    return results
+
+
+# ========= Inbox (WEBHOOK_ASYNC_MODE) =========
+# A rota grava o payload cru e responde 204; os workers reservam lotes
+# (PENDING -> PROCESSING), aplicam com apply_batch e marcam DONE/ERROR.
+# Entrega é at-least-once: se o worker cair no meio, a reserva expira
+# (WEBHOOK_INBOX_LEASE_SECONDS) e o lote é refeito; a idempotência por txid
+# garante que o crédito não duplica.
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def enqueue(db: AsyncSession, payload: str, origem: str = "psp_pix") -> int:
+    """Grava a entrega no inbox e commita. Retorna o id."""
+    row = WebhookInbox(origem=origem, payload=payload, status="PENDING", tentativas=0, recebido_em=_utcnow())
+    db.add(row)
+    await db.commit()
+    return row.id
+
+
+def _claimable(now: datetime, lease_s: int):
+    stale = now - timedelta(seconds=lease_s)
+    return or_(
+        WebhookInbox.status == "PENDING",
+        and_(WebhookInbox.status == "PROCESSING", WebhookInbox.reservado_em < stale),
+    )
+
+
+async def claim(db: AsyncSession, limit: int, lease_s: int) -> tuple[str, list]:
+    """
+    Reserva até `limit` entregas (as pendentes e as com reserva vencida) num
+    UPDATE só; no Postgres o SKIP LOCKED deixa workers concorrentes pegarem
+    lotes diferentes sem esperar. Retorna (token do lote, linhas id/payload/tentativas).
+    """
+    token = uuid.uuid4().hex
+    now = _utcnow()
+    ids = (
+        select(WebhookInbox.id)
+        .where(_claimable(now, lease_s))
+        .order_by(WebhookInbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    res = await db.execute(
+        update(WebhookInbox)
+        .where(WebhookInbox.id.in_(ids), _claimable(now, lease_s))
+        .values(status="PROCESSING", lote=token, reservado_em=now, tentativas=WebhookInbox.tentativas + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if not res.rowcount:
+        return token, []
+    # colunas, não entidades: o apply_batch pode dar rollback (expira tudo na sessão)
+    rows = await db.execute(
+        select(WebhookInbox.id, WebhookInbox.payload, WebhookInbox.tentativas)
+        .where(WebhookInbox.lote == token)
+        .order_by(WebhookInbox.id)
+    )
+    return token, rows.all()
+
+
+async def _finish(db: AsyncSession, token: str, done: list[dict]) -> None:
+    t = WebhookInbox.__table__
+    await db.execute(
+        t.update()
+        .where(t.c.id == bindparam("rid"), t.c.lote == token)
+        .values(status=bindparam("st"), resultado=bindparam("res"), processado_em=bindparam("ts")),
+        done,
+    )
+    await db.commit()
+
+
+async def process_claimed(db: AsyncSession, token: str, rows: list, max_tentativas: int) -> dict[str, int]:
+    """Aplica um lote reservado. Retorna a contagem por resultado."""
+    items = []
+    for r in rows:
+        try:
+            items.append(json.loads(r.payload))
+        except ValueError:
+            items.append(None)  # vira "invalid" no apply_batch
+
+    try:
+        results = await apply_batch(db, items)
+    except Exception as e:
+        # falha de banco/infra: volta pra fila (ou ERROR após max_tentativas)
+        await db.rollback()
+        now = _utcnow()
+        await _finish(db, token, [
+            {"rid": r.id, "st": "ERROR" if r.tentativas >= max_tentativas else "PENDING",
+             "res": f"erro: {e}"[:255], "ts": now}
+            for r in rows
+        ])
+        raise
+
+    now = _utcnow()
+    counts: dict[str, int] = {}
+    done = []
+    for r, res in zip(rows, results):
+        counts[res["result"]] = counts.get(res["result"], 0) + 1
+        if res["result"] == "invalid":
+            st = "ERROR"
+        elif res["result"] == "error":
+            st = "ERROR" if r.tentativas >= max_tentativas else "PENDING"  # volta pra fila
+        else:
+            st = "DONE"
+        done.append({"rid": r.id, "st": st, "res": res["result"], "ts": now})
+    await _finish(db, token, done)
+    return counts
+
+
+async def inbox_metrics(db: AsyncSession) -> dict:
+    """Profundidade da fila por status e lag (idade da entrega pendente mais antiga)."""
+    by_status = dict(
+        (await db.execute(select(WebhookInbox.status, func.count()).group_by(WebhookInbox.status))).all()
+    )
+    oldest = (
+        await db.execute(select(func.min(WebhookInbox.recebido_em)).where(WebhookInbox.status.in_(("PENDING", "PROCESSING"))))
+    ).scalar()
+    lag = 0.0
+    if oldest is not None:
+        if oldest.tzinfo is None:  # SQLite devolve naive (gravado em UTC)
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        lag = max(0.0, (_utcnow() - oldest).total_seconds())
+    return {
+        "depth": by_status.get("PENDING", 0) + by_status.get("PROCESSING", 0),
+        "by_status": by_status,
+        "lag_seconds": round(lag, 3),
+    }
+
+
+class InboxWorkers:
+    """Pool de tasks asyncio que drena o inbox em lotes (start/stop no ciclo de vida do app)."""
+
+    def __init__(
+        self,
+        workers: int = settings.WEBHOOK_WORKERS,
+        batch: int = settings.WEBHOOK_INBOX_BATCH,
+        poll_ms: int = settings.WEBHOOK_INBOX_POLL_MS,
+        lease_s: int = settings.WEBHOOK_INBOX_LEASE_SECONDS,
+        max_tentativas: int = settings.WEBHOOK_INBOX_MAX_TENTATIVAS,
+    ):
+        self.workers = workers
+        self.batch = batch
+        self.poll_s = poll_ms / 1000
+        self.lease_s = lease_s
+        self.max_tentativas = max_tentativas
+        self._tasks: list[asyncio.Task] = []
+        self._stop: asyncio.Event | None = None
+        self.batches = 0
+        self.processed = 0
+        self.failures = 0
+        self.results: dict[str, int] = {}
+        self.last_batch_ms = 0.0
+
+    async def drain_once(self) -> int:
+        """Reserva e aplica um lote. Retorna quantas entregas processou."""
+        from app.db.session import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            token, rows = await claim(db, self.batch, self.lease_s)
+            if not rows:
+                return 0
+            t0 = asyncio.get_running_loop().time()
+            counts = await process_claimed(db, token, rows, self.max_tentativas)
+        self.last_batch_ms = (asyncio.get_running_loop().time() - t0) * 1000
+        self.batches += 1
+        self.processed += len(rows)
+        for k, v in counts.items():
+            self.results[k] = self.results.get(k, 0) + v
+        return len(rows)
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                n = await self.drain_once()
+            except Exception as e:
+                self.failures += 1
+                print("[INBOX] lote falhou:", e)
+                n = 0
+            if n < self.batch:
+                # fila vazia (ou lote parcial): espera o próximo poll
+                try:
+                    await asyncio.wait_for(self._stop.wait(), self.poll_s)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._stop = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        if not self._tasks:
+            return
+        self._stop.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {
+            "running": bool(self._tasks),
+            "workers": self.workers,
+            "batch": self.batch,
+            "batches": self.batches,
+            "processed": self.processed,
+            "failures": self.failures,
+            "results": dict(self.results),
+            "last_batch_ms": round(self.last_batch_ms, 3),
+        }
+
+
+inbox_workers = InboxWorkers()
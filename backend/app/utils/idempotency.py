@@ -0,0 +1,122 @@
+# app/utils/idempotency.py
+"""
+Idempotência de entregas (webhooks): cache LRU+TTL em memória na frente de uma
+tabela durável de chaves únicas (`idempotency_keys`).
+
+Fluxo:
+  1. `await idempotency.seen(db, chave)`: cache e, se faltar, 1 lookup por PK.
+  2. processa; `idempotency.add(db, chave)` na MESMA transação dos efeitos.
+  3. após o commit, `idempotency.mark(chave)`. Se o commit falhar com
+     IntegrityError, outra entrega concorrente ganhou: trate como duplicada.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.idempotency_key import IdempotencyKey
+
+
+class TTLCache:
+    """LRU com expiração por item. Thread-safe."""
+
+    def __init__(self, ttl_seconds: float, max_items: int = 100_000):
+        self.ttl = ttl_seconds
+        self.max_items = max_items
+        self._data: OrderedDict[str, float] = OrderedDict()  # chave -> expira (monotonic)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            exp = self._data.get(key)
+            if exp is None or exp <= now:
+                if exp is not None:
+                    del self._data[key]
+                self.misses += 1
+                return False
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True
+
+    def add(self, key: str, ttl: float | None = None) -> None:
+        exp = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = exp
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class IdempotencyStore:
+    PURGE_EVERY = 1000  # a cada N chaves gravadas, apaga as vencidas da tabela
+
+    def __init__(self, ttl_seconds: int, max_items: int = 100_000):
+        self.ttl = ttl_seconds
+        self.cache = TTLCache(ttl_seconds, max_items)
+        self._added = 0
+
+    def _now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def _existing_stmt(self, keys):
+        return select(IdempotencyKey.chave).where(
+            IdempotencyKey.chave.in_(list(keys)), IdempotencyKey.expira_em > self._now()
+        )
+
+    async def seen(self, db: AsyncSession, key: str) -> bool:
+        if key in self.cache:
+            return True
+        found = (await db.execute(self._existing_stmt([key]))).first() is not None
+        if found:
+            self.cache.add(key)
+        return found
+
+    async def seen_many(self, db: AsyncSession, keys) -> set[str]:
+        """Subconjunto de `keys` já processado (1 query para o que não está no cache)."""
+        keys = set(keys)
+        hit = {k for k in keys if k in self.cache}
+        rest = keys - hit
+        if rest:
+            found = set((await db.execute(self._existing_stmt(rest))).scalars())
+            for k in found:
+                self.cache.add(k)
+            hit |= found
+        return hit
+
+    def add(self, db: Session | AsyncSession, key: str) -> None:
+        """Grava a chave na transação corrente (commit junto com os efeitos)."""
+        db.add(IdempotencyKey(chave=key, expira_em=self._now() + timedelta(seconds=self.ttl)))
+        self._added += 1
+
+    def mark(self, *keys: str) -> None:
+        """Depois do commit: responde as próximas entregas só pelo cache."""
+        for k in keys:
+            self.cache.add(k)
+
+    def purge_stmt(self):
+        return delete(IdempotencyKey).where(IdempotencyKey.expira_em <= self._now())
+
+    def should_purge(self) -> bool:
+        if self._added >= self.PURGE_EVERY:
+            self._added = 0
+            return True
+        return False
+
+    def stats(self) -> dict:
+        return {"cached": len(self.cache), "hits": self.cache.hits, "misses": self.cache.misses}
+
+
+idempotency = IdempotencyStore(settings.IDEMP_CACHE_TTL_SECONDS)
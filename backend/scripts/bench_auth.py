@@ -0,0 +1,57 @@
+"""
+Custo de autenticação por request: jwt.decode completo (HMAC + claims) x cache
+de claims de app/core/security.py. Simula o polling paginado do frontend: poucos
+tokens, cada um verificado muitas vezes, em várias threads.
+
+Uso (a partir de backend/):
+    python scripts/bench_auth.py [requests] [threads] [tokens]
+"""
+import sys, time, pathlib, threading
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from app.core.security import _decode, claims_cache, create_access_token, decode_token
+
+
+def run(fn, tokens: list[str], requests: int, threads: int) -> float:
+    per_thread = requests // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(n):
+        barrier.wait()
+        for i in range(per_thread):
+            fn(tokens[(n + i) % len(tokens)], "access")
+
+    ts = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    for t in ts:
+        t.join()
+    return (time.perf_counter() - t0) / (per_thread * threads)
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    n_tokens = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    tokens = [create_access_token(sub=str(i), extra={"user": f"u{i}"}) for i in range(n_tokens)]
+    cached = lambda tok, expect: decode_token(tok, expect=expect)
+
+    print(f"[bench] {requests} requests, {threads} threads, {n_tokens} tokens")
+    for nthreads in (1, threads):
+        full = run(_decode, tokens, requests, nthreads)
+        claims_cache.clear()
+        fast = run(cached, tokens, requests, nthreads)
+        print(
+            f"[bench] threads={nthreads:<3} jwt.decode {full * 1e6:8.2f} µs/req | "
+            f"cache {fast * 1e6:8.2f} µs/req | {full / fast:5.1f}x"
+        )
+    print(f"[bench] cache: {claims_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compressão das listagens/exports: bytes economizados x CPU gasta, por
+codificação e nível, com o mesmo flush por chunk do CompressionMiddleware.
+
+Uso (a partir de backend/):
+    python scripts/bench_compression.py [linhas]
+
+Usa um SQLite temporário próprio. zstd só aparece com `zstandard` instalado.
+"""
+import os, sys, time, random, pathlib, tempfile
+from datetime import datetime, timedelta
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench_comp_"), "comp.db")
+os.environ["COMPRESSION_ENABLED"] = "0"  # pega o corpo cru; comprime aqui
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+
+from app.main import app
+from app.core.compression import make_compressor, zstandard
+from app.database.init_db import init_db
+from app.db.session import engine
+from app.models.transaction import Transaction
+
+CHUNK = 50_000
+CSV_CHUNK_BYTES = 64 * 1024  # ~1000 linhas, o lote do _iter_csv
+
+
+def seed(n: int) -> None:
+    init_db()
+    rnd = random.Random(1)
+    base = datetime(2022, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, nome, email, cpf, senha_hash) VALUES (1, 'b', 'b@x', '0', 'x')"))
+        conn.execute(text("INSERT INTO wallets (id, user_id, saldo_atual) VALUES (1, 1, 0)"))
+        for lo in range(0, n, CHUNK):
+            conn.execute(insert(Transaction.__table__), [
+                {"wallet_id": 1, "tipo": "CREDITO" if rnd.random() < 0.6 else "DEBITO",
+                 "valor": round(rnd.uniform(1, 5000), 2), "referencia": f"pix:{rnd.getrandbits(64):016x}",
+                 "criado_em": base + timedelta(seconds=i * 37)}
+                for i in range(lo, min(n, lo + CHUNK))
+            ])
+
+
+def run(encoding: str, level: int, chunks: list[bytes]) -> tuple[int, float]:
+    c = make_compressor(encoding, level, level)
+    t0 = time.process_time()
+    out = sum(len(c.chunk(ch)) for ch in chunks[:-1]) + len(c.finish(chunks[-1]))
+    return out, time.process_time() - t0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    seed(n)
+    client = TestClient(app)
+    csv_body = client.get("/api/v1/ledger/1/csv").content
+    json_body = client.get("/api/v1/ledger/1", params={"page_size": 200}).content
+
+    payloads = {
+        "csv (export)": [csv_body[i:i + CSV_CHUNK_BYTES] for i in range(0, len(csv_body), CSV_CHUNK_BYTES)],
+        "json (página 200)": [json_body],
+    }
+    configs = [("gzip", lvl) for lvl in (1, 6, 9)]
+    if zstandard is not None:
+        configs += [("zstd", lvl) for lvl in (1, 3, 9, 19)]
+
+    for name, chunks in payloads.items():
+        size = sum(map(len, chunks))
+        print(f"[bench] {name}: {size / 1e6:.2f} MB em {len(chunks)} chunk(s)")
+        print(f"[bench] {'codificação':12} | {'MB':>7} | {'razão':>6} | {'economia':>8} | {'CPU ms':>8} | {'ms/MB':>7}")
+        for enc, lvl in configs:
+            out, cpu = run(enc, lvl, chunks)
+            print(
+                f"[bench] {enc + ' ' + str(lvl):12} | {out / 1e6:>7.3f} | {size / out:>6.1f} | "
+                f"{(1 - out / size) * 100:>7.1f}% | {cpu * 1000:>8.1f} | {cpu * 1000 / (size / 1e6):>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Export do ledger: CSV x Parquet x Arrow IPC. Tamanho, tempo pra gerar (rota
+HTTP, streaming) e tempo pra carregar no pyarrow (o que o time de analytics faz).
+
+Uso (a partir de backend/):
+    python scripts/bench_export_columnar.py [linhas]
+
+Usa um SQLite temporário próprio. Precisa de pyarrow.
+"""
+import io, os, sys, time, random, pathlib, tempfile
+from datetime import datetime, timedelta
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench_columnar_"), "col.db")
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+
+from app.main import app
+from app.database.init_db import init_db
+from app.db.session import engine
+from app.models.transaction import Transaction
+
+CHUNK = 50_000
+
+
+def seed(n: int) -> None:
+    init_db()
+    rnd = random.Random(1)
+    base = datetime(2022, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, nome, email, cpf, senha_hash) VALUES (1, 'b', 'b@x', '0', 'x')"))
+        conn.execute(text("INSERT INTO wallets (id, user_id, saldo_atual) VALUES (1, 1, 0)"))
+        for lo in range(0, n, CHUNK):
+            conn.execute(insert(Transaction.__table__), [
+                {"wallet_id": 1, "tipo": "CREDITO" if rnd.random() < 0.6 else "DEBITO",
+                 "valor": round(rnd.uniform(1, 5000), 2), "referencia": f"pix:{rnd.getrandbits(64):016x}",
+                 "criado_em": base + timedelta(seconds=i * 37)}
+                for i in range(lo, min(n, lo + CHUNK))
+            ])
+
+
+def load(kind: str, data: bytes):
+    if kind == "csv":
+        opts = pacsv.ParseOptions(delimiter=",")
+        return pacsv.read_csv(io.BytesIO(data), parse_options=opts)
+    if kind == "parquet":
+        return pq.read_table(io.BytesIO(data))
+    return pa.ipc.open_stream(data).read_all()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    seed(n)
+    client = TestClient(app)
+    urls = {
+        "csv": "/api/v1/ledger/1/csv?csv_sep=,&csv_decimal=dot",
+        "parquet": "/api/v1/ledger/1/columnar?fmt=parquet",
+        "arrow": "/api/v1/ledger/1/columnar?fmt=arrow",
+    }
+    print(f"[bench] {n} lançamentos")
+    print(f"[bench] {'formato':8} | {'MB':>8} | {'x CSV':>6} | {'gerar s':>8} | {'carregar s':>10} | linhas")
+    csv_size = None
+    for kind, url in urls.items():
+        t0 = time.perf_counter()
+        r = client.get(url)
+        gen = time.perf_counter() - t0
+        assert r.status_code == 200, r.text
+        data = r.content
+        csv_size = csv_size or len(data)
+        t0 = time.perf_counter()
+        table = load(kind, data)
+        ld = time.perf_counter() - t0
+        print(
+            f"[bench] {kind:8} | {len(data) / 1e6:>8.2f} | {csv_size / len(data):>6.1f} | {gen:>8.2f}"
+            f" | {ld:>10.3f} | {table.num_rows}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark dos totais do /extrato: loop em Python (antigo) x agregação SQL (_totais_stmt,
+a mesma query que a rota executa).
+
+Uso (a partir de backend/):
+    python scripts/bench_extrato.py                      # 10k, 100k, 1M
+    python scripts/bench_extrato.py 10000 1000000 10000000 --no-old
+
+Usa um SQLite temporário próprio (não mexe no dev.db).
+"""
+import os, sys, time, random, pathlib, tempfile
+from datetime import datetime, timedelta
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.user import User  # noqa: F401
+from app.models.wallet import Wallet  # noqa: F401
+from app.models.transaction import Transaction
+from app.api.v1.routes.extrato import _totais_row, _totais_stmt
+
+CHUNK = 50_000
+RUNS = 5
+
+
+def seed(engine, n: int, start_at: int) -> None:
+    base = datetime(2020, 1, 1)
+    rnd = random.Random(start_at)
+    with engine.begin() as conn:
+        if start_at == 0:
+            conn.execute(text("INSERT INTO users (id, nome, email, cpf, senha_hash) VALUES (1, 'b', 'b@x', '0', 'x')"))
+            conn.execute(text("INSERT INTO wallets (id, user_id, saldo_atual) VALUES (1, 1, 0)"))
+        for lo in range(start_at, n, CHUNK):
+            rows = [
+                {
+                    "wallet_id": 1,
+                    "tipo": "CREDITO" if rnd.random() < 0.6 else "DEBITO",
+                    "valor": rnd.randint(1, 100_000) / 100,
+                    "referencia": f"pix:{i}",
+                    "criado_em": base + timedelta(minutes=i),
+                }
+                for i in range(lo, min(n, lo + CHUNK))
+            ]
+            conn.execute(insert(Transaction.__table__), rows)
+
+
+def old_totals(db, conds):
+    all_rows = db.query(Transaction).filter(*conds).all()
+    credito = debito = 0.0
+    for t in all_rows:
+        v = float(t.valor or 0)
+        k = str(t.tipo or "").upper()
+        if k == "CREDITO":
+            credito += v
+        elif k == "DEBITO":
+            debito += v
+    return len(all_rows), credito, debito
+
+
+def timeit(fn) -> float:
+    best = float("inf")
+    for _ in range(RUNS):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    sizes = sorted(int(a) for a in args) or [10_000, 100_000, 1_000_000]
+    run_old = "--no-old" not in sys.argv
+
+    tmp = tempfile.mkdtemp(prefix="bench_extrato_")
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    # "mês passado" relativo ao fim dos dados: janela fixa, o resto da tabela cresce
+    print(f"[bench] {'linhas':>10} | {'agregado (ms)':>13} | {'loop python (ms)':>16}")
+    seeded = 0
+    for n in sizes:
+        seed(engine, n, seeded)
+        seeded = n
+        end = datetime(2020, 1, 1) + timedelta(minutes=n)
+        conds = [Transaction.criado_em >= end - timedelta(days=30), Transaction.criado_em <= end]
+        with Session() as db:
+            stmt = _totais_stmt(conds, Transaction.tipo, Transaction.valor)
+            new_ms = timeit(lambda: _totais_row(db.execute(stmt).one()))
+            old_ms = timeit(lambda: old_totals(db, conds)) if run_old else float("nan")
+        print(f"[bench] {n:>10} | {new_ms:>13.2f} | {old_ms:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Throughput do lançamento em lote (POST /ledger/{id}/entries): lançamentos/s
+pelo serviço direto e pela rota HTTP (inclui validação pydantic do corpo).
+
+Uso (a partir de backend/):
+    python scripts/bench_ledger_bulk.py [lançamentos_por_lote] [lotes]
+
+Usa um SQLite temporário próprio, ou DATABASE_URL se vier no ambiente
+(a meta de 50k/s é no Postgres).
+"""
+import os, sys, time, pathlib, tempfile
+from decimal import Decimal
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench_bulk_"), "bulk.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import case, func, select
+
+from app.main import app
+from app.database.init_db import init_db
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction
+from app.schemas.ledger import PostLedgerEntry
+from app.services.ledger_service import post_ledger_entries, range_totals
+
+
+def new_wallet() -> int:
+    with SessionLocal() as db:
+        u = User(nome="bulk", email=f"bulk{time.time_ns()}@x", cpf=str(time.time_ns())[-14:], senha_hash="x")
+        db.add(u); db.flush()
+        w = Wallet(user_id=u.id, saldo_atual=0)
+        db.add(w); db.commit()
+        return w.id
+
+
+def batch(tag: str, n: int) -> list[dict]:
+    return [
+        {"tipo": "CREDITO" if i % 4 else "DEBITO", "valor": f"{i % 500 + 1}.{i % 100:02d}", "referencia": f"{tag}:{i}"}
+        for i in range(n)
+    ]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    lotes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    init_db()
+    print(f"[bench] {lotes} lotes de {n} lançamentos ({os.environ['DATABASE_URL'].split(':')[0]})")
+
+    wid = new_wallet()
+    total = 0.0
+    for k in range(lotes):
+        entries = [PostLedgerEntry(**e) for e in batch(f"svc{k}", n)]
+        t0 = time.perf_counter()
+        with SessionLocal() as db:
+            post_ledger_entries(db, wid, entries)
+        total += time.perf_counter() - t0
+    print(f"[bench] serviço : {n * lotes / total:>10.0f} lançamentos/s")
+
+    wid2 = new_wallet()
+    client = TestClient(app)
+    total = 0.0
+    for k in range(lotes):
+        body = batch(f"http{k}", n)
+        t0 = time.perf_counter()
+        r = client.post(f"/api/v1/ledger/{wid2}/entries", json=body)
+        total += time.perf_counter() - t0
+        assert r.status_code == 201, r.text
+    print(f"[bench] HTTP    : {n * lotes / total:>10.0f} lançamentos/s")
+
+    # conferência: saldo e totais diários batem com a soma dos lançamentos
+    with SessionLocal() as db:
+        for w in (wid, wid2):
+            saldo = db.get(Wallet, w).saldo_atual
+            soma = db.scalar(
+                select(func.sum(case((Transaction.tipo == "CREDITO", Transaction.valor), else_=-Transaction.valor)))
+                .where(Transaction.wallet_id == w)
+            )
+            n_tot, cr, dbt = range_totals(db, w)
+            print(f"[bench] carteira {w}: saldo={saldo} soma={soma} totais_diarios={cr - dbt:.2f} ({n_tot} lançamentos)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Micro-benchmark da serialização de uma página do GET /ledger (page_size=200):
+ORM + getattr por atributo (caminho antigo) x tuplas de colunas + _rows_to_json.
+
+Uso (a partir de backend/):
+    python scripts/bench_ledger_page.py [page_size] [repeticoes]
+
+Usa um SQLite temporário próprio (não mexe no dev.db).
+"""
+import os, sys, time, pathlib, tempfile
+from datetime import datetime, timedelta
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine, desc, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.user import User  # noqa: F401
+from app.models.wallet import Wallet  # noqa: F401
+from app.api.v1.routes.ledger import (
+    DATE_COL, DESC_COL, ROW_COLS, TIPO_COL, TM, VALOR_COL, _fmt_dt, _rows_to_json,
+)
+
+
+def old_serialize(items):
+    # cópia do corpo antigo de get_ledger (ORM + getattr/_get_attr por linha)
+    def _get_attr(obj, col):
+        if hasattr(col, "key"):
+            try:
+                return getattr(obj, col.key)
+            except Exception:
+                pass
+        for name in ("criado_em", "data", "created_at"):
+            if hasattr(obj, name):
+                return getattr(obj, name)
+        return None
+
+    out = []
+    for it in items:
+        dt = _get_attr(it, DATE_COL)
+        desc_txt = getattr(it, getattr(DESC_COL, "key", "referencia"), None)
+        if desc_txt is None:
+            desc_txt = getattr(it, "descricao", "") or ""
+        out.append(
+            {
+                "id": getattr(it, "id", None),
+                "data": _fmt_dt(dt),
+                "tipo": getattr(it, getattr(TIPO_COL, "key", "tipo"), ""),
+                "valor": float(getattr(it, getattr(VALOR_COL, "key", "valor"), 0.0) or 0.0),
+                "descricao": desc_txt,
+            }
+        )
+    return out
+
+
+def best_us(fn, reps: int) -> float:
+    best = float("inf")
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e6
+
+
+def main():
+    page_size = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    reps = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    tmp = tempfile.mkdtemp(prefix="bench_ledger_")
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+    Base.metadata.create_all(engine)
+    base = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, nome, email, cpf, senha_hash) VALUES (1, 'b', 'b@x', '0', 'x')"))
+        conn.execute(text("INSERT INTO wallets (id, user_id, saldo_atual) VALUES (1, 1, 0)"))
+        conn.execute(
+            insert(TM.__table__),
+            [
+                {"wallet_id": 1, "tipo": "CREDITO" if i % 3 else "DEBITO", "valor": i / 100,
+                 "referencia": f"pix:{i:026d}", "criado_em": base + timedelta(minutes=i)}
+                for i in range(page_size * 5)
+            ],
+        )
+    Session = sessionmaker(bind=engine)
+
+    def q(db):
+        return db.query(TM).filter(TM.wallet_id == 1).order_by(desc(DATE_COL)).limit(page_size)
+
+    with Session() as db:
+        orm_rows = q(db).all()
+        tuple_rows = q(db).with_entities(*ROW_COLS).all()
+        assert old_serialize(orm_rows) == _rows_to_json(tuple_rows)
+
+        ser_old = best_us(lambda: old_serialize(orm_rows), reps)
+        ser_new = best_us(lambda: _rows_to_json(tuple_rows), reps)
+
+    def full_old():
+        with Session() as db:
+            old_serialize(q(db).all())
+
+    def full_new():
+        with Session() as db:
+            _rows_to_json(q(db).with_entities(*ROW_COLS).all())
+
+    e2e_old = best_us(full_old, reps)
+    e2e_new = best_us(full_new, reps)
+
+    print(f"[bench] page_size={page_size} reps={reps} (melhor tempo)")
+    print(f"[bench] {'':26} | {'antigo':>10} | {'novo':>10} | ganho")
+    print(f"[bench] {'serialização/linha (us)':26} | {ser_old / page_size:>10.2f} | {ser_new / page_size:>10.2f} | {ser_old / ser_new:.1f}x")
+    print(f"[bench] {'query+serial./página (us)':26} | {e2e_old:>10.0f} | {e2e_new:>10.0f} | {e2e_old / e2e_new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
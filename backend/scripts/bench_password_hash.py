@@ -0,0 +1,48 @@
+"""
+Custo de verificação de senha por esquema/parâmetro (o que um login paga de CPU).
+
+Uso (a partir de backend/):
+    python scripts/bench_password_hash.py [verificações_por_config]
+
+argon2 só aparece se argon2-cffi estiver instalado.
+"""
+import sys, time, pathlib
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from app.core.security import _argon2_available, make_pwd_context
+
+CONFIGS = [
+    ("bcrypt", {"bcrypt_rounds": 10}),
+    ("bcrypt", {"bcrypt_rounds": 11}),
+    ("bcrypt", {"bcrypt_rounds": 12}),
+    ("bcrypt", {"bcrypt_rounds": 13}),
+    ("argon2", {"argon2_time_cost": 2, "argon2_memory_cost_kb": 19456, "argon2_parallelism": 1}),
+    ("argon2", {"argon2_time_cost": 3, "argon2_memory_cost_kb": 65536, "argon2_parallelism": 1}),
+    ("argon2", {"argon2_time_cost": 2, "argon2_memory_cost_kb": 65536, "argon2_parallelism": 4}),
+]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"[bench] {runs} verificações por configuração")
+    print(f"[bench] {'esquema':8} | {'parâmetros':70} | {'verify ms':>9} | {'hash ms':>8}")
+    for scheme, params in CONFIGS:
+        if scheme == "argon2" and not _argon2_available():
+            print(f"[bench] {scheme:8} | {'(argon2-cffi não instalado)':70} |")
+            continue
+        ctx = make_pwd_context(scheme, **params)
+        t0 = time.perf_counter()
+        h = ctx.hash("senha-de-teste")
+        hash_ms = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        for _ in range(runs):
+            assert ctx.verify("senha-de-teste", h)
+        verify_ms = (time.perf_counter() - t0) / runs * 1000
+        desc = ", ".join(f"{k}={v}" for k, v in params.items())
+        print(f"[bench] {scheme:8} | {desc:70} | {verify_ms:>9.1f} | {hash_ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Cache de resultado do GET /ledger/{id}: latência da mesma consulta (página 1,
+order_by=data desc) sem cache, com o LRU em processo e com o backend externo
+sobre o KV local. Confere que o corpo e os headers X-* do hit batem com o miss.
+
+Uso (a partir de backend/):
+    python scripts/bench_result_cache.py [linhas] [requisições]
+
+Usa um SQLite temporário próprio.
+"""
+import os, sys, time, random, pathlib, statistics, tempfile
+from datetime import datetime, timedelta
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench_rcache_"), "rcache.db")
+os.environ["COMPRESSION_ENABLED"] = "0"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+
+from app.main import app
+from app.core.result_cache import make_backend, result_cache
+from app.database.init_db import init_db
+from app.db.session import SessionLocal, engine
+from app.models.transaction import Transaction
+from app.services.ledger_service import rebuild_daily_totals
+
+CHUNK = 50_000
+URL = "/api/v1/ledger/1?page=1&page_size=50&order_by=data&order_dir=desc&start=2022-03-01&end=2022-09-30"
+
+
+def seed(n: int) -> None:
+    init_db()
+    rnd = random.Random(1)
+    base = datetime(2022, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, nome, email, cpf, senha_hash) VALUES (1, 'b', 'b@x', '0', 'x')"))
+        conn.execute(text("INSERT INTO wallets (id, user_id, saldo_atual) VALUES (1, 1, 0)"))
+        for lo in range(0, n, CHUNK):
+            conn.execute(insert(Transaction.__table__), [
+                {"wallet_id": 1, "tipo": "CREDITO" if rnd.random() < 0.6 else "DEBITO",
+                 "valor": round(rnd.uniform(1, 5000), 2), "referencia": f"pix:{i}",
+                 "criado_em": base + timedelta(seconds=i * 97)}
+                for i in range(lo, min(n, lo + CHUNK))
+            ])
+    with SessionLocal() as db:
+        rebuild_daily_totals(db)
+
+
+def _x(r) -> dict:
+    return {k: v for k, v in r.headers.items() if k.startswith("x-")}
+
+
+def run(client: TestClient, requests: int) -> tuple[list[float], object]:
+    lat, first = [], None
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        r = client.get(URL)
+        lat.append((time.perf_counter() - t0) * 1000)
+        first = first or r
+        assert r.status_code == 200 and r.content == first.content and _x(r) == _x(first)
+    return lat, first
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    seed(n)
+    client = TestClient(app)
+    print(f"[bench] {n} lançamentos, {requests} GETs iguais")
+    print(f"[bench] {'backend':8} | {'p50 ms':>8} | {'p99 ms':>8} | {'hit_ratio':>9}")
+    ref = None
+    for kind in ("off", "memory", "local"):
+        result_cache.backend = make_backend(kind)
+        result_cache.hits = result_cache.misses = 0
+        lat, first = run(client, requests)
+        ref = ref or first
+        assert first.content == ref.content and _x(first) == _x(ref), "resposta do cache difere"
+        lat.sort()
+        print(
+            f"[bench] {kind:8} | {statistics.median(lat):>8.2f} | {lat[int(len(lat) * 0.99) - 1]:>8.2f}"
+            f" | {result_cache.stats()['hit_ratio']:>9.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Concorrência no SQLite: escritas estilo webhook (saldo + Transaction) em paralelo
+com leituras do ledger (página + totais), com e sem o perfil de app/db/session.py.
+
+Uso (a partir de backend/):
+    python scripts/bench_sqlite_concurrency.py [segundos] [escritores] [leitores]
+
+Usa SQLite temporários próprios (não mexe no dev.db).
+"""
+import os, sys, time, random, pathlib, tempfile, threading
+from datetime import datetime, timedelta
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine, desc, insert, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.session import apply_sqlite_profile
+from app.models.user import User  # noqa: F401
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction
+from app.services.ledger_service import rebuild_daily_totals, range_totals
+
+WALLETS = 20
+SEED_ROWS = 20_000
+
+
+def build(path: str, tuned: bool):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    if tuned:
+        apply_sqlite_profile(engine)
+    Base.metadata.create_all(engine)
+    base = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, nome, email, cpf, senha_hash) VALUES (1, 'b', 'b@x', '0', 'x')"))
+        for w in range(1, WALLETS + 1):
+            conn.execute(text("INSERT INTO wallets (id, user_id, saldo_atual) VALUES (:w, 1, 0)"), {"w": w})
+        conn.execute(
+            insert(Transaction.__table__),
+            [
+                {"wallet_id": 1 + i % WALLETS, "tipo": "CREDITO", "valor": 1,
+                 "referencia": f"seed:{i}", "criado_em": base + timedelta(minutes=i)}
+                for i in range(SEED_ROWS)
+            ],
+        )
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        rebuild_daily_totals(db)
+    return engine, Session
+
+
+def run(Session, seconds: float, writers: int, readers: int) -> dict:
+    stats = {"writes": 0, "reads": 0, "locked": 0, "other_errors": 0}
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def bump(key):
+        with lock:
+            stats[key] += 1
+
+    def writer(n):
+        rnd = random.Random(n)
+        i = 0
+        while time.perf_counter() < stop:
+            i += 1
+            db = Session()
+            try:
+                w = db.get(Wallet, rnd.randint(1, WALLETS))
+                w.saldo_atual = (w.saldo_atual or 0) + 1
+                db.add(Transaction(wallet_id=w.id, tipo="CREDITO", valor=1, referencia=f"pix:{n}:{i}"))
+                db.commit()
+                bump("writes")
+            except OperationalError as e:
+                db.rollback()
+                bump("locked" if "locked" in str(e) else "other_errors")
+            finally:
+                db.close()
+
+    def reader(n):
+        rnd = random.Random(1000 + n)
+        while time.perf_counter() < stop:
+            db = Session()
+            try:
+                wid = rnd.randint(1, WALLETS)
+                db.execute(
+                    select(Transaction.id, Transaction.criado_em, Transaction.valor)
+                    .where(Transaction.wallet_id == wid)
+                    .order_by(desc(Transaction.criado_em))
+                    .limit(50)
+                ).all()
+                range_totals(db, wid)
+                db.commit()
+                bump("reads")
+            except OperationalError as e:
+                db.rollback()
+                bump("locked" if "locked" in str(e) else "other_errors")
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return stats
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    tmp = tempfile.mkdtemp(prefix="bench_sqlite_")
+    print(f"[bench] {seconds:.0f}s, {writers} escritores, {readers} leitores")
+    print(f"[bench] {'perfil':8} | {'escritas/s':>10} | {'leituras/s':>10} | {'locked':>6} | {'outros':>6}")
+    for name, tuned in (("padrão", False), ("tuning", True)):
+        engine, Session = build(os.path.join(tmp, f"{name}.db"), tuned)
+        s = run(Session, seconds, writers, readers)
+        engine.dispose()
+        print(
+            f"[bench] {name:8} | {s['writes'] / seconds:>10.1f} | {s['reads'] / seconds:>10.1f}"
+            f" | {s['locked']:>6} | {s['other_errors']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Confere os totais diários (wallet_daily_totals) contra a soma direta em
+`transactions` depois de INSERT, UPDATE (valor, tipo, data e carteira) e DELETE
+via ORM, olhando os headers X-Total-* do GET /ledger/{id}.
+
+Uso (a partir de backend/):
+    python scripts/check_daily_totals.py
+
+Usa um SQLite temporário próprio. Exit code 1 se algum total divergir.
+"""
+import os, sys, pathlib, tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="check_totals_"), "totals.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import case, func, select
+
+from app.main import app
+from app.database.init_db import init_db
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction
+
+PERIODO = {"start": "2024-01-01", "end": "2024-01-31"}
+
+
+def seed() -> list[int]:
+    init_db()
+    with SessionLocal() as db:
+        db.add(User(id=1, nome="c", email="c@x", cpf="1", senha_hash="x"))
+        db.add_all([Wallet(id=1, user_id=1, saldo_atual=0), Wallet(id=2, user_id=1, saldo_atual=0)])
+        db.flush()
+        txs = [
+            Transaction(wallet_id=1, tipo="CREDITO" if i % 3 else "DEBITO", valor=Decimal(10 + i),
+                        referencia=f"c{i}", criado_em=datetime(2024, 1, 1 + i % 20, 12))
+            for i in range(30)
+        ]
+        db.add_all(txs)
+        db.commit()
+        return [t.id for t in txs]
+
+
+def esperado(wallet_id: int, params: dict) -> dict:
+    """Soma direta em `transactions` (sem os buckets)."""
+    ds = datetime.fromisoformat(params["start"])
+    de = datetime.fromisoformat(params["end"]) + timedelta(days=1)
+    with SessionLocal() as db:
+        n, cr, dbt = db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(case((Transaction.tipo == "CREDITO", Transaction.valor), else_=0)), 0),
+                func.coalesce(func.sum(case((Transaction.tipo == "DEBITO", Transaction.valor), else_=0)), 0),
+            ).where(Transaction.wallet_id == wallet_id, Transaction.criado_em >= ds, Transaction.criado_em < de)
+        ).one()
+    return {"x-total": str(n), "x-total-credito": f"{float(cr):.2f}", "x-total-debito": f"{float(dbt):.2f}"}
+
+
+def main():
+    ids = seed()
+    client = TestClient(app)
+    falhas = 0
+
+    def confere(passo: str) -> None:
+        nonlocal falhas
+        for wallet_id in (1, 2):
+            r = client.get(f"/api/v1/ledger/{wallet_id}", params=PERIODO)
+            got = {k: r.headers[k] for k in ("x-total", "x-total-credito", "x-total-debito")}
+            exp = esperado(wallet_id, PERIODO)
+            ok = got == exp
+            falhas += not ok
+            print(f"[check] {passo:24} wallet {wallet_id}: {'ok' if ok else 'DIVERGE'} {got}" + ("" if ok else f" esperado {exp}"))
+
+    confere("insert")
+    with SessionLocal() as db:
+        db.get(Transaction, ids[0]).valor = Decimal("999.99")               # valor
+        db.get(Transaction, ids[1]).tipo = "DEBITO"                         # tipo
+        db.get(Transaction, ids[2]).criado_em = datetime(2024, 1, 28, 9)    # muda de dia
+        db.get(Transaction, ids[3]).wallet_id = 2                           # muda de carteira
+        db.get(Transaction, ids[4]).referencia = "só a referência"          # não mexe nos totais
+        db.commit()
+    confere("update")
+    with SessionLocal() as db:
+        db.delete(db.get(Transaction, ids[5]))
+        db.commit()
+    confere("delete")
+
+    print("[check] OK" if not falhas else f"[check] FALHOU ({falhas})")
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Confere a revalidação HTTP (ETag / If-None-Match / If-Modified-Since) do
+GET /wallets e do GET /ledger/{id}: 304 sem mudança, 200 depois de criar
+carteira ou lançar.
+
+Uso (a partir de backend/):
+    python scripts/check_http_cache.py
+
+Usa um SQLite temporário próprio. Exit code 1 se algum passo falhar.
+"""
+import os, sys, time, pathlib, tempfile
+from datetime import datetime
+from decimal import Decimal
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="check_http_"), "http.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database.init_db import init_db
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction
+
+
+def main():
+    init_db()
+    with SessionLocal() as db:
+        db.add(User(id=1, nome="h", email="h@x", cpf="1", senha_hash="x"))
+        db.add(Wallet(id=1, user_id=1, saldo_atual=0))
+        db.add(Transaction(wallet_id=1, tipo="CREDITO", valor=Decimal("5"), referencia="h0", criado_em=datetime(2024, 1, 1)))
+        db.commit()
+
+    client = TestClient(app)
+    falhas = 0
+
+    def passo(nome: str, r, status: int) -> None:
+        nonlocal falhas
+        ok = r.status_code == status
+        falhas += not ok
+        print(f"[check] {nome:46} {r.status_code} {'ok' if ok else f'esperado {status}'}")
+
+    w = client.get("/api/v1/wallets")
+    led = client.get("/api/v1/ledger/1")
+    passo("wallets If-None-Match sem mudança", client.get("/api/v1/wallets", headers={"If-None-Match": w.headers["etag"]}), 304)
+    passo("ledger If-None-Match sem mudança", client.get("/api/v1/ledger/1", headers={"If-None-Match": led.headers["etag"]}), 304)
+    passo("ledger If-Modified-Since sem mudança", client.get("/api/v1/ledger/1", headers={"If-Modified-Since": led.headers["last-modified"]}), 304)
+
+    time.sleep(1.1)  # Last-Modified tem resolução de segundo
+    with SessionLocal() as db:
+        db.add(Wallet(id=2, user_id=1, saldo_atual=0))
+        db.commit()
+    passo("wallets If-Modified-Since após criar carteira", client.get("/api/v1/wallets", headers={"If-Modified-Since": w.headers["last-modified"]}), 200)
+    passo("wallets If-None-Match após criar carteira", client.get("/api/v1/wallets", headers={"If-None-Match": w.headers["etag"]}), 200)
+
+    with SessionLocal() as db:
+        db.add(Transaction(wallet_id=1, tipo="DEBITO", valor=Decimal("1"), referencia="h1"))
+        db.commit()
+    passo("ledger If-None-Match após lançamento", client.get("/api/v1/ledger/1", headers={"If-None-Match": led.headers["etag"]}), 200)
+    passo("ledger If-Modified-Since após lançamento", client.get("/api/v1/ledger/1", headers={"If-Modified-Since": led.headers["last-modified"]}), 200)
+
+    print("[check] OK" if not falhas else f"[check] FALHOU ({falhas})")
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Confere que o FastJSONResponse (orjson) gera os mesmos bytes do JSONResponse do
+Starlette depois do jsonable_encoder (caminho padrão do FastAPI), e que os dois
+recusam NaN/Infinity. Exceção documentada em app/core/responses.py: floats em
+notação científica (`GRAFIA_FLOAT`) só precisam dar o mesmo valor.
+
+Uso (a partir de backend/):
+    python scripts/check_json_response.py
+
+Exit code 1 se algum payload divergir.
+"""
+import sys, json, math, pathlib, uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.responses import FastJSONResponse, orjson
+
+
+class Item(BaseModel):
+    id: int
+    valor: Decimal
+    data: datetime
+    tags: list[str] = []
+
+
+class Pagina(BaseModel):
+    itens: list[Item]
+    total: float
+    proxima: str | None = None
+
+
+GRAFIA_FLOAT = {"floats"}  # 1e16 x 1e+16: bytes diferentes, mesmo valor
+
+AWARE = datetime(2024, 3, 5, 12, 30, 15, 123456, tzinfo=timezone.utc)
+PAYLOADS = {
+    "datetimes": {
+        "naive": datetime(2024, 1, 1, 8, 0),
+        "micro": datetime(2024, 1, 1, 8, 0, 0, 1),
+        "aware": AWARE,
+        "offset": AWARE.astimezone(timezone(timedelta(hours=-3))),
+        "date": date(2024, 2, 29),
+        "time": time(23, 59, 59, 999999),
+    },
+    "decimal": [Decimal("10"), Decimal("10.50"), Decimal("0.01"), Decimal("-3.3"), Decimal("1E+2"), Decimal("123456789.99")],
+    "non_str_keys": {1: "um", 2.5: "dois e meio", True: "sim", None: "nada"},
+    "nested_models": Pagina(
+        itens=[Item(id=1, valor=Decimal("9.90"), data=AWARE, tags=["pix", "ção"]),
+               Item(id=2, valor=Decimal("100"), data=datetime(2024, 1, 1))],
+        total=109.9,
+    ),
+    "floats": [0.1, 1.5, -0.0, 1e16, 1e-7, 123456.789, 2.0 ** 60],
+    "unicode": {"descricao": "Pagamento — ação \"PIX\" \\ \n tab\t", "emoji": "💸"},
+    "ints": [0, -1, 2 ** 53, 2 ** 63 - 1, 2 ** 70],
+    "misc": {"uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"), "set": {3}, "tuple": (1, "a"), "vazio": [], "null": None},
+}
+
+
+def main():
+    falhas = 0
+    print(f"[check] orjson {'ativo' if orjson is not None else 'ausente (stdlib)'}")
+    for nome, payload in PAYLOADS.items():
+        content = jsonable_encoder(payload)
+        esperado = JSONResponse(content).body
+        obtido = FastJSONResponse(content).body
+        direto = FastJSONResponse(payload).body if not isinstance(payload, BaseModel) else obtido  # rota quente (sem encoder)
+        ok = obtido == esperado and direto == esperado
+        nota = ""
+        if not ok and nome in GRAFIA_FLOAT:
+            ok = json.loads(obtido) == json.loads(esperado) == json.loads(direto)
+            nota = " (mesmo valor, grafia de float diferente)"
+        falhas += not ok
+        print(f"[check] {nome:14} {'ok' if ok else 'DIVERGE'}{nota}")
+        if not ok:
+            print(f"         starlette: {esperado!r}\n         fast:      {obtido!r}\n         direto:    {direto!r}")
+
+    for nome, valor in (("nan", math.nan), ("inf", math.inf), ("-inf", -math.inf), ("nan aninhado", {"a": [1.0, {"b": math.nan}]})):
+        erros = []
+        for cls in (JSONResponse, FastJSONResponse):
+            try:
+                cls({"v": valor})
+                erros.append(None)
+            except ValueError as e:
+                erros.append(type(e).__name__)
+        ok = erros[0] is not None and erros == [erros[0]] * 2
+        falhas += not ok
+        print(f"[check] {nome:14} {'ok' if ok else 'DIVERGE'} {erros}")
+
+    print("[check] OK" if not falhas else f"[check] FALHOU ({falhas})")
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Login storm x leituras do ledger no MESMO processo: mede p50/p99 de
+GET /ledger/{id} enquanto chegam N logins concorrentes (bcrypt), com o bcrypt
+no event loop (PASSWORD_POOL_WORKERS=0, comportamento antigo) e no pool.
+
+Uso (a partir de backend/):
+    python scripts/load_login_burst.py [logins] [leitores] [workers_pool]
+
+Usa um SQLite temporário próprio.
+"""
+import os, sys, json, time, asyncio, pathlib, tempfile
+from datetime import datetime, timedelta
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="load_login_"), "load.db")
+
+import httpx
+from sqlalchemy import insert
+
+from app.main import app
+from app.database.init_db import init_db
+from app.db.session import SessionLocal
+from app.core.password_pool import password_pool
+from app.core.security import hash_password
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction
+from app.services.ledger_service import rebuild_daily_totals
+
+PASSWORD = "s3nha-forte"
+
+
+def setup() -> int:
+    init_db()
+    with SessionLocal() as db:
+        u = User(nome="load", email="load@x.com", cpf="123", senha_hash=hash_password(PASSWORD))
+        db.add(u); db.flush()
+        w = Wallet(user_id=u.id, saldo_atual=0)
+        db.add(w); db.flush()
+        base = datetime(2024, 1, 1)
+        db.execute(insert(Transaction.__table__), [
+            {"wallet_id": w.id, "tipo": "CREDITO" if i % 3 else "DEBITO", "valor": 10,
+             "referencia": f"load:{i}", "criado_em": base + timedelta(minutes=i)}
+            for i in range(5000)
+        ])
+        db.commit()
+        rebuild_daily_totals(db, w.id)
+        return w.id
+
+
+def pct(xs: list[float], p: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(len(xs) * p))] * 1000 if xs else 0.0
+
+
+async def scenario(wallet_id: int, logins: int, readers: int) -> dict:
+    lat: list[float] = []
+    codes: dict[int, int] = {}
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load") as c:
+        async def reader():
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                r = await c.get(f"/api/v1/ledger/{wallet_id}", params={"page_size": 50})
+                lat.append(time.perf_counter() - t0)
+                assert r.status_code == 200, r.status_code
+
+        async def login():
+            body = json.dumps({"email": "load@x.com", "password": PASSWORD})
+            r = await c.post("/api/v1/login", content=body, headers={"content-type": "application/json"})
+            codes[r.status_code] = codes.get(r.status_code, 0) + 1
+
+        tasks = [asyncio.create_task(reader()) for _ in range(readers)]
+        await asyncio.sleep(0.5)  # aquece
+        lat.clear()
+        t0 = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        burst = time.perf_counter() - t0
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    return {"burst_s": burst, "reads": len(lat), "p50": pct(lat, 0.50), "p99": pct(lat, 0.99),
+            "max": max(lat) * 1000 if lat else 0.0, "logins": codes}
+
+
+async def run_all(wallet_id: int, logins: int, readers: int, workers: int) -> None:
+    # um event loop só: o engine async fica preso ao loop em que abriu as conexões
+    print(f"[bench] {logins} logins concorrentes, {readers} leitores do ledger")
+    print(f"[bench] {'modo':12} | {'burst s':>7} | {'leituras':>8} | {'p50 ms':>8} | {'p99 ms':>8} | {'max ms':>8} | logins")
+    for name, w in (("no loop", 0), (f"pool({workers})", workers)):
+        password_pool.configure(w, logins)
+        r = await scenario(wallet_id, logins, readers)
+        print(
+            f"[bench] {name:12} | {r['burst_s']:>7.2f} | {r['reads']:>8} | {r['p50']:>8.1f}"
+            f" | {r['p99']:>8.1f} | {r['max']:>8.1f} | {r['logins']}"
+        )
+    print(f"[bench] pool: {password_pool.stats()}")
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    asyncio.run(run_all(setup(), logins, readers, workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Stress do webhook PIX: dispara N confirmações em paralelo para a MESMA carteira
+(cada txid entregue K vezes) e confere saldo final e lançamentos.
+
+Uso (a partir de backend/):
+    python scripts/stress_webhook.py [n_txids] [entregas_por_txid] [concorrencia]
+
+Usa um SQLite temporário próprio, ou DATABASE_URL se vier no ambiente.
+"""
+import os, sys, json, hmac, hashlib, asyncio, pathlib, tempfile, time
+from decimal import Decimal
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="stress_pix_"), "stress.db")
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.main import app
+from app.database.init_db import init_db
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.models.transaction import Transaction
+from app.models.pix_invoice import PixInvoice
+
+
+def setup(n: int) -> tuple[int, int, Decimal]:
+    init_db()
+    with SessionLocal() as db:
+        u = User(nome="stress", email=f"stress{time.time_ns()}@x", cpf=str(time.time_ns())[-14:], senha_hash="x")
+        db.add(u); db.flush()
+        w = Wallet(user_id=u.id, saldo_atual=0)
+        db.add(w); db.flush()
+        total = Decimal("0")
+        for i in range(n):
+            valor = Decimal(i % 97 + 1) + Decimal("0.25")
+            db.add(PixInvoice(user_id=u.id, txid=f"st{u.id}x{i}", valor=valor, status="PENDING"))
+            total += valor
+        db.commit()
+        return u.id, w.id, total
+
+
+async def fire(user_id: int, n: int, repeats: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    codes: dict[int, int] = {}
+
+    async def one(client, i):
+        body = json.dumps({"txid": f"st{user_id}x{i}", "valor": str(i % 97 + 1) + ".25"}).encode()
+        sig = hmac.new(settings.WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+        async with sem:
+            r = await client.post("/api/v1/webhooks/psp/pix", content=body, headers={"X-Signature": sig})
+        codes[r.status_code] = codes.get(r.status_code, 0) + 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://stress") as client:
+        await asyncio.gather(*(one(client, i) for _ in range(repeats) for i in range(n)))
+    return codes
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    user_id, wallet_id, expected = setup(n)
+    t0 = time.perf_counter()
+    codes = asyncio.run(fire(user_id, n, repeats, concurrency))
+    dt = time.perf_counter() - t0
+
+    with SessionLocal() as db:
+        saldo = Decimal(str(db.get(Wallet, wallet_id).saldo_atual))
+        ntx = db.scalar(select(func.count()).select_from(Transaction).where(Transaction.wallet_id == wallet_id))
+
+    print(f"[stress] {n} txids x {repeats} entregas, concorrência {concurrency}: {dt:.2f}s, status={codes}")
+    print(f"[stress] saldo={saldo} esperado={expected} lançamentos={ntx} esperado={n}")
+    ok = saldo == expected and ntx == n and set(codes) == {204}
+    print("[stress] OK" if ok else "[stress] FALHOU")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
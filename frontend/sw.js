@@ -1,5 +1,5 @@
-// Service Worker - cache básico (v15)
-const CACHE = "dilspay-v15";
+// Service Worker - cache básico (v16)
+const CACHE = "dilspay-v16";
 const PRECACHE = [
   "/frontend/extrato.html",
   // adicione aqui seus assets se quiser pré-cachear:
@@ -28,7 +28,9 @@ self.addEventListener("activate", (event) => {
 });
 
 // Fetch:
-// - API: network-first com fallback ao cache (e cache leve da resposta)
+// - API: network-first com fallback ao cache (e cache leve da resposta).
+//   A revalidação fica com o HTTP cache do browser: o servidor manda ETag +
+//   "no-cache", o fetch envia If-None-Match e um 304 chega aqui como o 200 guardado.
 // - Estático: cache-first com ignoreSearch (funciona com ?v=...)
 self.addEventListener("fetch", (event) => {
   const req = event.request;
@@ -37,8 +39,11 @@ self.addEventListener("fetch", (event) => {
     event.respondWith(
       fetch(req)
         .then((res) => {
-          const resClone = res.clone();
-          caches.open(CACHE).then((c) => c.put(req, resClone)).catch(() => undefined);
+          // só guarda resposta boa: erro não sobrescreve a última cópia do fallback offline
+          if (res.ok && req.method === "GET") {
+            const resClone = res.clone();
+            caches.open(CACHE).then((c) => c.put(req, resClone)).catch(() => undefined);
+          }
           return res;
         })
         .catch(() => caches.match(req, { ignoreSearch: true }))